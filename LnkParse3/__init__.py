@@ -1 +1,6 @@
 from LnkParse3.lnk_file import LnkFile as lnk_file
+from LnkParse3.lnk_header import peek_header
+from LnkParse3.batch import parse_many
+from LnkParse3.batch import write_ndjson
+from LnkParse3.lnk_batch import LnkBatch
+from LnkParse3.records import LnkRecord
@@ -0,0 +1,127 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from LnkParse3.batch import get_json
+from LnkParse3.batch import parse_file
+from LnkParse3.diagnostics import LENIENT
+
+"""
+asyncio entry points. Reading and decoding run in an executor, never on
+the event loop; the number of files in flight is limited by a semaphore,
+which may be shared by several callers, and the number of queued files is
+bounded, which also bounds the memory held by queued reads.
+"""
+
+DEFAULT_CONCURRENCY = 8
+
+
+async def parse_async(
+    path,
+    cp=None,
+    handler=get_json,
+    executor=None,
+    semaphore=None,
+    raw=False,
+    validation=LENIENT,
+    mmap=False,
+):
+    """
+    Parse one file in `executor` (the loop's default one if None) and return
+    a `ParseResult`. With `semaphore`, waits for it before the file is read.
+    `raw`, `validation` and `mmap` are those of `parse_many`.
+    """
+    loop = asyncio.get_running_loop()
+    parse = partial(
+        parse_file,
+        path,
+        cp,
+        handler,
+        raw=raw,
+        validation=validation,
+        mmap=mmap,
+    )
+    if semaphore is None:
+        return await loop.run_in_executor(executor, parse)
+    async with semaphore:
+        return await loop.run_in_executor(executor, parse)
+
+
+async def _iterate(paths):
+    if hasattr(paths, "__aiter__"):
+        async for path in paths:
+            yield path
+    else:
+        for path in paths:
+            yield path
+
+
+async def aiter_parse(
+    paths,
+    concurrency=DEFAULT_CONCURRENCY,
+    ordered=False,
+    cp=None,
+    handler=get_json,
+    executor=None,
+    semaphore=None,
+    raw=False,
+    validation=LENIENT,
+    mmap=False,
+):
+    """
+    Parse `paths` (an iterable or an async iterable) with at most
+    `concurrency` files in flight and yield a `ParseResult` for each.
+    Results come as they complete, or in input order with `ordered`.
+    Without `executor`, a thread pool of `concurrency` threads is used.
+    A `semaphore` shared by several calls limits the files in flight of all
+    of them; `raw`, `validation` and `mmap` are those of `parse_many`.
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(concurrency)
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    pending = deque()
+    try:
+        async for path in _iterate(paths):
+            if len(pending) >= concurrency:
+                # Backpressure, no more paths are taken until a file is done.
+                # With a shared semaphore, queued files wait for their turn
+                async for result in _drain(pending, ordered, until_empty=False):
+                    yield result
+            task = asyncio.ensure_future(
+                parse_async(
+                    path,
+                    cp,
+                    handler,
+                    executor,
+                    semaphore,
+                    raw=raw,
+                    validation=validation,
+                    mmap=mmap,
+                )
+            )
+            pending.append(task)
+
+        async for result in _drain(pending, ordered, until_empty=True):
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+async def _drain(pending, ordered, until_empty):
+    while pending:
+        if ordered:
+            yield await pending.popleft()
+        else:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.remove(task)
+                yield task.result()
+        if not until_empty:
+            return
@@ -0,0 +1,399 @@
+import glob
+import json
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
+from time import perf_counter
+
+from LnkParse3.diagnostics import LENIENT
+from LnkParse3.lnk_file import LnkFile
+from LnkParse3.lnk_file import json_default
+from LnkParse3.memory import measure
+from LnkParse3.memory import tracing
+from LnkParse3.parse_context import ParseContext
+from LnkParse3.stats import FileStats
+
+"""
+Parsing of many files. Files are parsed in chunks by a pool of worker
+processes; a failure to parse a file is returned as a value, not raised.
+"""
+
+GLOB_CHARS = "*?["
+NDJSON_BATCH_SIZE = 256
+
+ParseResult = namedtuple("ParseResult", ["path", "result", "error"])
+
+
+def get_json(lnk, get_all=False, fields=None):
+    return lnk.get_json(get_all, fields=fields)
+
+
+def get_record(lnk):
+    """
+    Compact `LnkRecord` of `lnk`, for keeping the results of many files.
+    """
+    return lnk.get_record()
+
+
+def ndjson_record(lnk, get_all=False, target=False, fields=None):
+    """
+    Compact JSON of `lnk` (of its shortcut target only with `target`),
+    for `write_ndjson`.
+    """
+    if target:
+        res = {"shortcut_target": lnk.lnk_command}
+    else:
+        res = lnk.get_json(get_all, format_times=True, fields=fields)
+    return json.dumps(res, separators=(",", ":"), default=json_default)
+
+
+def profiled(handler, lnk):
+    """
+    Result of `handler` for `lnk` and the metrics of its parse, for
+    `parse_many` with `profile`.
+    """
+    return handler(lnk), lnk.metrics
+
+
+def parse_file(
+    path,
+    cp=None,
+    handler=get_json,
+    ctx=None,
+    raw=False,
+    validation=LENIENT,
+    profile=False,
+    mmap=False,
+):
+    """
+    Parse one file and apply `handler` (a picklable callable taking
+    a `LnkFile`) to it. Returns a `ParseResult`. With `mmap`, large files are
+    mapped instead of read (see `map_file`).
+    """
+    try:
+        lnk = LnkFile(
+            path=path,
+            cp=cp,
+            lazy=True,
+            ctx=ctx,
+            raw=raw,
+            validation=validation,
+            profile=profile,
+            mmap=mmap,
+        )
+        return ParseResult(path, handler(lnk), None)
+    except Exception as e:
+        return ParseResult(path, None, "%s: %s" % (type(e).__name__, e))
+
+
+def _with_stats(parse, ctx, path):
+    start = perf_counter()
+    res = parse(path)
+    if res.error is not None:
+        return res
+    record = FileStats(
+        perf_counter() - start, len(ctx.data), dict(ctx.diagnostics.counts)
+    )
+    return res._replace(result=(res.result, record))
+
+
+def _with_memory(parse, ctx, path):
+    res, record = measure(parse, path, ctx)
+    if res.error is not None:
+        return res
+    return res._replace(result=(res.result, record))
+
+
+def _parse_chunk(
+    paths,
+    cp,
+    handler,
+    raw=False,
+    validation=LENIENT,
+    profile=False,
+    memory=False,
+    stats=False,
+    mmap=False,
+):
+    with tracing() if memory else nullcontext():
+        # One context per chunk, reset for each file. Created while tracing,
+        # so that the metrics count allocations.
+        ctx = ParseContext(
+            cp=cp, raw=raw, validation=validation, profile=profile or memory
+        )
+        parse = partial(parse_file, cp=cp, handler=handler, ctx=ctx, mmap=mmap)
+        if stats:
+            parse = partial(_with_stats, parse, ctx)
+        if memory:
+            parse = partial(_with_memory, parse, ctx)
+        return [parse(path) for path in paths]
+
+
+def _chunks(paths, chunksize):
+    it = iter(paths)
+    while True:
+        chunk = list(islice(it, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_many(
+    paths,
+    workers=None,
+    chunksize=64,
+    ordered=False,
+    cp=None,
+    handler=get_json,
+    raw=False,
+    validation=LENIENT,
+    profile=False,
+    memory=False,
+    stats=False,
+    mmap=False,
+):
+    """
+    Parse `paths` in `workers` processes (all CPUs by default, in this
+    process if 1) and yield a `ParseResult` for each of them as soon as its
+    chunk is done. With `ordered`, results are yielded in input order.
+    With `raw`, values are not formatted (ints, GUID bytes and integer
+    FILETIME/DOS values). With `validation` "strict", a value which MUST be
+    set and is not fails the file. With `mmap`, large files are mapped
+    instead of read.
+
+    The result of a file is that of `handler`, which these options wrap in
+    tuples, in this order: with `profile`, (result, `Metrics` of the file);
+    with `stats`, (result, `FileStats` for `RunStats`); with `memory`,
+    allocations are traced (see `LnkParse3.memory`) and (result,
+    `FileMemory`). Tracing slows the whole parse down, the times of `stats`
+    are not meaningful with `memory`.
+
+    If a worker process dies, the files of the chunks in flight fail with
+    a `BrokenProcessPool` error and the others are parsed in a new pool.
+    """
+    if profile:
+        handler = partial(profiled, handler)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    chunks = _chunks(paths, chunksize)
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _parse_chunk(
+                chunk, cp, handler, raw, validation, profile, memory, stats, mmap
+            )
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Bound the number of chunks in flight or waiting to be reordered,
+        # `paths` may be huge
+        max_pending = workers * 4
+        pending = {}
+        reorder = {}
+        submitted = 0
+        next_index = 0
+
+        while True:
+            while len(pending) + len(reorder) < max_pending:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                future = executor.submit(
+                    _parse_chunk,
+                    chunk,
+                    cp,
+                    handler,
+                    raw,
+                    validation,
+                    profile,
+                    memory,
+                    stats,
+                    mmap,
+                )
+                pending[future] = (submitted, chunk)
+                submitted += 1
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            while done:
+                for future in done:
+                    index, chunk = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except BrokenProcessPool as e:
+                        # A worker died (a signal, out of memory...), each
+                        # file of its chunk fails
+                        broken = True
+                        error = "%s: %s" % (type(e).__name__, e)
+                        results = [ParseResult(path, None, error) for path in chunk]
+                    if not ordered:
+                        yield from results
+                        continue
+                    reorder[index] = results
+                # A broken pool fails all the chunks in flight
+                done = wait(pending)[0] if broken else ()
+
+            if broken:
+                executor.shutdown()
+                executor = ProcessPoolExecutor(max_workers=workers)
+
+            while next_index in reorder:
+                yield from reorder.pop(next_index)
+                next_index += 1
+    finally:
+        executor.shutdown()
+
+
+def write_ndjson(
+    paths,
+    stream=None,
+    workers=1,
+    batch_size=NDJSON_BATCH_SIZE,
+    cp=None,
+    get_all=False,
+    target=False,
+    fields=None,
+    raw=False,
+    validation=LENIENT,
+    metrics=None,
+    memory=None,
+    stats=None,
+    mmap=False,
+):
+    """
+    Parse `paths` and write one JSON object per line to the text `stream`
+    (stdout by default), in input order. Every record has "path" and
+    "error" keys next to the parsed data (only `fields` of it, if given).
+    Lines are written and flushed `batch_size` records at a time. With
+    `raw`, values are not formatted (GUIDs are written in hex). With
+    `metrics` (a `Metrics`), the files are profiled and their metrics are
+    merged into it. With `memory` (a `MemoryReport`), the memory of the
+    files is added to it, with `stats` (a `RunStats`) their statistics.
+    With `mmap`, large files are mapped instead of read. Returns the number of failed files.
+    """
+    if stream is None:
+        stream = sys.stdout
+    handler = partial(ndjson_record, get_all=get_all, target=target, fields=fields)
+    dumps = json.dumps
+
+    failed = 0
+    lines = []
+    for path, result, error in parse_many(
+        paths,
+        workers=workers,
+        ordered=True,
+        cp=cp,
+        handler=handler,
+        raw=raw,
+        validation=validation,
+        profile=metrics is not None,
+        memory=memory is not None,
+        stats=stats is not None,
+        mmap=mmap,
+    ):
+        if error is None and memory is not None:
+            result, record = result
+            memory.add(record)
+        if error is None and stats is not None:
+            result, record = result
+            stats.add(path, record)
+        if error is not None and stats is not None:
+            stats.add_error(path, error)
+        if error is None and metrics is not None:
+            result, file_metrics = result
+            metrics.merge(file_metrics)
+        if error is None:
+            # The record is serialized in the worker, only prepend the keys
+            rest = result[1:]
+            sep = "," if rest != "}" else ""
+            lines.append('{"path":%s,"error":null%s%s\n' % (dumps(path), sep, rest))
+        else:
+            failed += 1
+            record = {"path": path, "error": error}
+            lines.append(dumps(record, separators=(",", ":")) + "\n")
+
+        if len(lines) >= batch_size:
+            stream.write("".join(lines))
+            stream.flush()
+            lines = []
+
+    if lines:
+        stream.write("".join(lines))
+    stream.flush()
+    return failed
+
+
+def walk(path):
+    """
+    All files under the directory `path`, recursively (symlinked directories
+    are not followed).
+    """
+    stack = [path]
+    while stack:
+        try:
+            entries = sorted(os.scandir(stack.pop()), key=lambda e: e.name)
+        except OSError:
+            continue
+        dirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+            else:
+                yield entry.path
+        stack.extend(reversed(dirs))
+
+
+def read_path_list(stream, chunk_size=64 * 1024):
+    """
+    Paths from a binary stream, delimited by NUL characters (e.g. output of
+    `find -print0`) or, if there is no NUL in the first chunk, by newlines.
+    """
+    delimiter = None
+    rest = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if delimiter is None and chunk:
+            delimiter = b"\x00" if b"\x00" in chunk else b"\n"
+        if not chunk:
+            break
+        *paths, rest = (rest + chunk).split(delimiter)
+        for path in paths:
+            if delimiter == b"\n":
+                path = path.rstrip(b"\r")
+            if path:
+                yield os.fsdecode(path)
+    if rest.strip():
+        yield os.fsdecode(rest.rstrip(b"\r\n"))
+
+
+def iter_paths(args, stdin=None):
+    """
+    Expand paths, directories (recursively), glob patterns and `-` (a path
+    list read from the binary stream `stdin`) into paths of files.
+    """
+    for arg in args:
+        if arg == "-" and stdin is not None:
+            yield from read_path_list(stdin)
+        elif os.path.isdir(arg):
+            yield from walk(arg)
+        elif not os.path.exists(arg) and any(c in arg for c in GLOB_CHARS):
+            for path in sorted(glob.glob(arg, recursive=True)):
+                if os.path.isdir(path):
+                    yield from walk(path)
+                else:
+                    yield path
+        else:
+            yield arg
@@ -0,0 +1,274 @@
+import argparse
+import cProfile
+import sys
+from contextlib import nullcontext
+from contextlib import redirect_stdout
+from functools import partial
+from io import StringIO
+
+from LnkParse3.lnk_file import __description__
+from LnkParse3.batch import iter_paths
+from LnkParse3.batch import parse_many
+from LnkParse3.batch import write_ndjson
+from LnkParse3.diagnostics import LENIENT
+from LnkParse3.diagnostics import VALIDATION_LEVELS
+from LnkParse3.memory import DEFAULT_RATIO
+from LnkParse3.memory import MemoryReport
+from LnkParse3.metrics import Metrics
+from LnkParse3.stats import DEFAULT_INTERVAL
+from LnkParse3.stats import RunStats
+
+"""
+Command line tool. Any number of files, directories (searched recursively),
+glob patterns and `-` (a list of paths on stdin, delimited by newlines or
+NUL characters) is accepted and all of them are parsed in one process, or in
+`--jobs` worker processes.
+"""
+
+
+def render(lnk, target=False, pjson=False, print_all=False, fields=None):
+    """
+    Output of the print methods of `lnk` as a string, and the diagnostics
+    collected while printing as strings. Runs in the workers, so that only
+    the text is sent back.
+    """
+    output = StringIO()
+    with redirect_stdout(output):
+        if target:
+            lnk.print_shortcut_target(pjson=pjson)
+        elif pjson or fields is not None:
+            lnk.print_json(print_all, fields)
+        else:
+            lnk.print_lnk_file(print_all)
+    return output.getvalue(), [str(diagnostic) for diagnostic in lnk.diagnostics]
+
+
+def build_parser():
+    arg_parser = argparse.ArgumentParser(description=__description__)
+    arg_parser.add_argument(
+        dest="files",
+        metavar="FILE",
+        nargs="+",
+        help="path to a file or a directory (searched recursively), a glob "
+        "pattern, or - to read newline or NUL delimited paths from stdin",
+    )
+    arg_parser.add_argument(
+        "-t", "--target", action="store_true", help="print shortcut target only"
+    )
+    arg_parser.add_argument(
+        "-j", "--json", action="store_true", help="print output in JSON"
+    )
+    arg_parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="print one compact JSON object per file and line, with its path "
+        "and error",
+    )
+    arg_parser.add_argument(
+        "--fields",
+        metavar="FIELDS",
+        type=lambda value: value.split(","),
+        help="comma separated dotted paths of the fields to print in JSON "
+        "(e.g. header.creation_time,extra.DISTRIBUTED_LINK_TRACKER_BLOCK), "
+        "only the structures they need are decoded",
+    )
+    arg_parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="print unformatted values: integers instead of hex strings, "
+        "FILETIME and DOS times as integers, GUIDs as plain hex",
+    )
+    arg_parser.add_argument(
+        "--validation",
+        choices=VALIDATION_LEVELS,
+        default=LENIENT,
+        help="values which MUST be set and are not fail the file (strict), "
+        "are reported on stderr (lenient, default) or are not checked (off)",
+    )
+    arg_parser.add_argument(
+        "-c",
+        "--codepage",
+        dest="cp",
+        default="cp1252",
+        help="set codepage of ASCII strings",
+    )
+    arg_parser.add_argument(
+        "-a",
+        "--all",
+        dest="print_all",
+        action="store_true",
+        help="print all extracted data (i.e. offsets and sizes)",
+    )
+    arg_parser.add_argument(
+        "-J",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="number of worker processes (default: 1)",
+    )
+    arg_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="map large files into memory instead of reading them; a file "
+        "truncated while it is parsed kills the process",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time, bytes and calls of each parsing stage, totalled "
+        "over all files, on stderr",
+    )
+    arg_parser.add_argument(
+        "--profile-dump",
+        metavar="PATH",
+        help="write cProfile statistics (pstats format) to PATH, worker "
+        "processes of --jobs are not profiled",
+    )
+    arg_parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="trace allocations (slow) and print the memory used by each "
+        "file and parsing stage on stderr; do not combine with --progress or "
+        "--prometheus, their latencies would include the tracing",
+    )
+    arg_parser.add_argument(
+        "--memory-ratio",
+        metavar="N",
+        type=float,
+        default=DEFAULT_RATIO,
+        help="with --memory, list the files which allocate more than N times "
+        "their size (default: %g)" % DEFAULT_RATIO,
+    )
+    arg_parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="print the number of files, failures, diagnostics and the "
+        "throughput on stderr while running",
+    )
+    arg_parser.add_argument(
+        "--prometheus",
+        metavar="PATH",
+        help="write counters, the parse latency histogram and the slowest "
+        "files to PATH in the Prometheus text format while running",
+    )
+    arg_parser.add_argument(
+        "--stats-interval",
+        metavar="SECONDS",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="interval of --progress and --prometheus (default: %g)" % DEFAULT_INTERVAL,
+    )
+    return arg_parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # A single file is printed exactly as before, anything else gets
+    # a header line before each file.
+    single = len(args.files) == 1 and args.files[0] != "-"
+    paths = iter_paths(args.files, stdin=sys.stdin.buffer)
+    if single:
+        paths = list(paths)
+        single = len(paths) == 1
+
+    metrics = Metrics() if args.profile else None
+    memory = MemoryReport(args.memory_ratio) if args.memory else None
+    stats = None
+    if args.progress or args.prometheus:
+        stats = RunStats(
+            interval=args.stats_interval,
+            progress=sys.stderr if args.progress else None,
+            prometheus=args.prometheus,
+        )
+
+    with stats if stats is not None else nullcontext():
+        if args.profile_dump is None:
+            status = run(args, paths, single, metrics, memory, stats)
+        else:
+            profiler = cProfile.Profile()
+            status = profiler.runcall(run, args, paths, single, metrics, memory, stats)
+            profiler.dump_stats(args.profile_dump)
+
+    if metrics is not None:
+        print(metrics.format(), file=sys.stderr)
+    if memory is not None:
+        print(memory.format(), file=sys.stderr)
+    return status
+
+
+def run(args, paths, single, metrics=None, memory=None, stats=None):
+    """
+    Parse and print `paths` as requested by `args`, returns the exit
+    status. With `metrics`, the files are profiled and their metrics are
+    merged into it; with `memory` and `stats`, their memory and statistics
+    are added to them.
+    """
+    if args.ndjson:
+        failed = write_ndjson(
+            paths,
+            workers=args.jobs,
+            cp=args.cp,
+            get_all=args.print_all,
+            target=args.target,
+            fields=args.fields,
+            raw=args.raw,
+            validation=args.validation,
+            metrics=metrics,
+            memory=memory,
+            stats=stats,
+            mmap=args.mmap,
+        )
+        return 1 if failed else 0
+
+    handler = partial(
+        render,
+        target=args.target,
+        pjson=args.json,
+        print_all=args.print_all,
+        fields=args.fields,
+    )
+
+    failed = False
+    for result in parse_many(
+        paths,
+        workers=args.jobs,
+        ordered=True,
+        cp=args.cp,
+        handler=handler,
+        raw=args.raw,
+        validation=args.validation,
+        profile=metrics is not None,
+        memory=memory is not None,
+        stats=stats is not None,
+        mmap=args.mmap,
+    ):
+        if result.error is not None:
+            failed = True
+            if stats is not None:
+                stats.add_error(result.path, result.error)
+            print("lnkparse: %s: %s" % (result.path, result.error), file=sys.stderr)
+            continue
+        rendered = result.result
+        if memory is not None:
+            rendered, record = rendered
+            memory.add(record)
+        if stats is not None:
+            rendered, record = rendered
+            stats.add(result.path, record)
+        if metrics is not None:
+            rendered, file_metrics = rendered
+            metrics.merge(file_metrics)
+        text, diagnostics = rendered
+        for diagnostic in diagnostics:
+            print("lnkparse: %s: %s" % (result.path, diagnostic), file=sys.stderr)
+        if not single:
+            sys.stdout.write("==> %s <==\n" % result.path)
+        sys.stdout.write(text)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
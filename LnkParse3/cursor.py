@@ -0,0 +1,128 @@
+import mmap
+import os
+import stat
+from struct import error as StructError
+from struct import calcsize
+from struct import unpack_from
+
+"""
+A Cursor is a read-only window into the binary data of a LNK file. It keeps
+a reference to the whole input buffer together with the start and the end
+of the window, so narrowing the window (e.g. `cursor[size:]`) never copies
+any data. Bytes are materialized only when a string is decoded.
+"""
+
+# Smaller files are read, mapping them saves nothing
+MMAP_THRESHOLD = 64 * 1024
+
+
+class Cursor:
+    __slots__ = ("_obj", "_view", "start", "end")
+
+    def __init__(self, data, start=0, end=None):
+        if isinstance(data, Cursor):
+            self._obj = data._obj
+            self._view = data._view
+        else:
+            self._obj = data
+            self._view = memoryview(data)
+            if self._view.format != "B" or self._view.ndim != 1:
+                self._view = self._view.cast("B")
+
+        size = len(self._view)
+        self.start = min(max(start, 0), size)
+        self.end = size if end is None else min(max(end, self.start), size)
+
+    @classmethod
+    def wrap(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(data if data is not None else b"")
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __bool__(self):
+        return self.end > self.start
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __bytes__(self):
+        return self.tobytes()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, end, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("Cursor does not support extended slicing")
+            return Cursor(self, self.start + start, self.start + max(start, end))
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("Cursor index out of range")
+        return self._view[self.start + key]
+
+    def view(self, start=0, end=None):
+        """
+        Zero-copy memoryview of the window (or of its part).
+        """
+        length = len(self)
+        start = min(max(start, 0), length)
+        end = length if end is None else min(max(end, start), length)
+        return self._view[self.start + start : self.start + end]
+
+    def tobytes(self, start=0, end=None):
+        return self.view(start, end).tobytes()
+
+    def unpack(self, fmt, offset=0):
+        """
+        Same as `struct.unpack(fmt, cursor[offset:offset + size])` but without
+        slicing. `fmt` is a format string or a precompiled `Struct`. Raises
+        `struct.error` when the window is too short.
+        """
+        size = calcsize(fmt) if isinstance(fmt, str) else fmt.size
+        if offset < 0 or offset + size > len(self):
+            msg = "unpack requires a buffer of %d bytes" % size
+            raise StructError(msg)
+        if isinstance(fmt, str):
+            return unpack_from(fmt, self._view, self.start + offset)
+        return fmt.unpack_from(self._view, self.start + offset)
+
+    def find(self, sub, start=0, end=None):
+        """
+        Index (relative to the window) of the first occurrence of `sub`
+        in `[start, end)`, or -1. Searches the underlying buffer directly
+        when it supports it (bytes, bytearray, mmap).
+        """
+        length = len(self)
+        start = min(max(start, 0), length)
+        end = length if end is None else min(max(end, start), length)
+
+        find = getattr(self._obj, "find", None)
+        if find is not None:
+            index = find(sub, self.start + start, self.start + end)
+            return index - self.start if index >= 0 else -1
+
+        index = self.tobytes(start, end).find(sub)
+        return index + start if index >= 0 else -1
+
+
+def map_file(path, threshold=MMAP_THRESHOLD):
+    """
+    Map a regular file of at least `threshold` bytes read-only into memory,
+    so that only the pages which are actually read are loaded (and shared in
+    the page cache). Smaller files, files which are not regular (pipes,
+    devices) and files which cannot be mapped are read as bytes. Reading a
+    mapped file which another process truncates kills the process (SIGBUS),
+    so mapping is only done on request.
+    """
+    with open(path, "rb") as fhandle:
+        info = os.fstat(fhandle.fileno())
+        if not stat.S_ISREG(info.st_mode) or info.st_size < threshold:
+            return fhandle.read()
+        try:
+            return mmap.mmap(fhandle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return fhandle.read()
@@ -3,18 +3,30 @@ from datetime import timezone
 from struct import unpack
 import functools
 import sys
-import warnings
 
+from LnkParse3.cursor import Cursor
+from LnkParse3.diagnostics import INVALID_DOSTIME
+from LnkParse3.diagnostics import INVALID_FILETIME
+from LnkParse3.diagnostics import OFF
+
+EPOCH_AS_FILETIME = 116444736000000000
+HUNDREDS_OF_NANOSECONDS = 10000000
+
+
+def must_be(expected, offset=None):
+    """
+    Check the result against `expected` (a field at `offset` in the file)
+    according to the validation level of the parse context.
+    """
 
-def must_be(expected):
     def outer(func):
         @functools.wraps(func)
         def inner(self, *args, **kwargs):
             result = func(self, *args, **kwargs)
 
-            if result != expected:
-                msg = "%s must be %s: %s" % (func.__name__, expected, result)
-                warnings.warn(msg)
+            ctx = self.ctx
+            if ctx.validation != OFF and result != expected:
+                ctx.invalid(func.__name__, expected, result, offset)
 
             return result
 
@@ -23,57 +35,79 @@ def must_be(expected):
     return outer
 
 
-def uuid(func):
-    @functools.wraps(func)
-    def inner(self, *args, **kwargs):
-        binary = func(self, *args, **kwargs)
+def format_uuid(binary):
+    # UUID variants
+    # https://docs.microsoft.com/en-us/openspecs/windows_protocols/ms-dtyp/49e490b8-f972-45d6-a3a4-99f924998d97
+    # Also see Java implementation (mslinks)
+    # https://github.com/DmitriiShamrikov/mslinks/blob/master/src/mslinks/data/GUID.java#L51
+    d1, d2, d3 = unpack("<LHH", binary[0:8])
+    d4, d51, d52 = unpack(">HHI", binary[8:16])
 
-        # UUID variants
-        # https://docs.microsoft.com/en-us/openspecs/windows_protocols/ms-dtyp/49e490b8-f972-45d6-a3a4-99f924998d97
-        # Also see Java implementation (mslinks)
-        # https://github.com/DmitriiShamrikov/mslinks/blob/master/src/mslinks/data/GUID.java#L51
-        d1, d2, d3 = unpack("<LHH", binary[0:8])
-        d4, d51, d52 = unpack(">HHI", binary[8:16])
+    return "%08X-%04X-%04X-%04X-%04X%08X" % (d1, d2, d3, d4, d51, d52)
 
-        uuid = "%08X-%04X-%04X-%04X-%04X%08X" % (d1, d2, d3, d4, d51, d52)
 
-        return uuid
+def raw_mode(obj):
+    """
+    True if `obj` belongs to a file parsed in raw mode, whose accessors
+    return ints, GUID bytes and integer FILETIME/DOS values unformatted.
+    """
+    ctx = getattr(obj, "ctx", None)
+    return ctx is not None and ctx.raw
 
-    return inner
 
+def formatted(formatter):
+    """
+    Apply `formatter` to the result of the accessor, unless in raw mode.
+    """
 
-def filetime(func):
-    @functools.wraps(func)
-    def inner(self, *args, **kwargs):
-        binary = func(self, *args, **kwargs)
+    def outer(func):
+        @functools.wraps(func)
+        def inner(self, *args, **kwargs):
+            result = func(self, *args, **kwargs)
+            if raw_mode(self):
+                return result
+            return formatter(result)
 
-        try:
-            nanosec = unpack("<q", binary)[0]
+        return inner
 
-            if nanosec == 0:
-                raise ValueError
-
-            epoch_as_filetime = 116444736000000000
-            hundreds_of_nanoseconds = 10000000
-
-            timestamp = (nanosec - epoch_as_filetime) / hundreds_of_nanoseconds
-            return datetime.fromtimestamp(timestamp, tz=timezone.utc)
-        except ValueError:
-            if sys.version_info < (3, 8, 0):
-                # HACK for older versions for bytes.hex()
-                # https://docs.python.org/3.9/library/stdtypes.html?highlight=hex#bytes.hex
-                iterator = iter(binary.hex())
-                invalid_date = " ".join(a + b for a, b in zip(iterator, iterator))
-            else:
-                invalid_date = binary.hex(" ")
-            msg = "Invalid filetime: %s" % invalid_date
-            warnings.warn(msg)
-            return None
+    return outer
 
-    return inner
+
+def _hex_bytes(binary):
+    if sys.version_info < (3, 8, 0):
+        # HACK for older versions for bytes.hex()
+        # https://docs.python.org/3.9/library/stdtypes.html?highlight=hex#bytes.hex
+        iterator = iter(binary.hex())
+        return " ".join(a + b for a, b in zip(iterator, iterator))
+    return binary.hex(" ")
+
+
+def filetime_to_datetime(nanosec):
+    """
+    FILETIME (an int) as an aware datetime. Raises `ValueError` for zero
+    (no time set).
+    """
+    if nanosec == 0:
+        raise ValueError
+
+    timestamp = (nanosec - EPOCH_AS_FILETIME) / HUNDREDS_OF_NANOSECONDS
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def datetime_to_filetime(value):
+    """
+    Datetime as FILETIME (an int). Naive datetimes are taken as UTC.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    seconds = delta.days * 86400 + delta.seconds
+    return (
+        EPOCH_AS_FILETIME + seconds * HUNDREDS_OF_NANOSECONDS + delta.microseconds * 10
+    )
 
 
-def dostime(func):
+def dostime_to_datetime(dos):
     r"""
     The DOS date/time format is a bitmask:
     24                16                 8                 0
@@ -85,6 +119,7 @@ def dostime(func):
     The year is stored as an offset from 1980.
     Seconds are stored in two-second increments.
     (So if the "second" value is 15, it actually represents 30 seconds.)
+    Raises `ValueError` for zero and for invalid dates.
     """
     #
     # Source:
@@ -92,35 +127,89 @@ def dostime(func):
     #   https://docs.microsoft.com/pl-pl/windows/desktop/api/winbase/nf-winbase-dosdatetimetofiletime
     #   https://github.com/log2timeline/dfdatetime/wiki/Date-and-time-values
     #
+    if dos == 0:
+        raise ValueError
+    ymdhms = (
+        ((dos & 0xFE000000) >> 25) + 1980,
+        ((dos & 0x01E00000) >> 21),
+        ((dos & 0x001F0000) >> 16),
+        ((dos & 0x0000F800) >> 11),
+        ((dos & 0x000007E0) >> 5),
+        ((dos & 0x0000001F) >> 0) * 2,
+    )
+
+    return datetime(*ymdhms, tzinfo=timezone.utc)
+
+
+def uuid(func):
     @functools.wraps(func)
     def inner(self, *args, **kwargs):
         binary = func(self, *args, **kwargs)
+        if raw_mode(self):
+            return bytes(binary)
+        return format_uuid(binary)
+
+    return inner
+
+
+def _field(binary, offset):
+    """
+    The bytes of a field and its offset in the file: `offset` if given, else
+    the start of `binary` if it is a window into the file.
+    """
+    if offset is None and isinstance(binary, Cursor):
+        offset = binary.start
+    return bytes(binary), offset
+
+
+def filetime(offset=None):
+    """
+    FILETIME as a datetime (None if invalid), or as an int in raw mode. An
+    invalid value is reported at `offset` (see `_field`).
+    """
 
-        try:
+    def outer(func):
+        @functools.wraps(func)
+        def inner(self, *args, **kwargs):
+            binary, at = _field(func(self, *args, **kwargs), offset)
+            nanosec = unpack("<q", binary)[0]
+            if raw_mode(self):
+                return nanosec
+
+            try:
+                return filetime_to_datetime(nanosec)
+            except ValueError:
+                msg = "Invalid filetime: %s" % _hex_bytes(binary)
+                self.ctx.report(INVALID_FILETIME, msg, at)
+                return None
+
+        return inner
+
+    return outer
+
+
+def dostime(offset=None):
+    """
+    DOS date/time as a datetime (None if invalid), or as an int in raw mode.
+    See `dostime_to_datetime`. An invalid value is reported at `offset` (see
+    `_field`).
+    """
+
+    def outer(func):
+        @functools.wraps(func)
+        def inner(self, *args, **kwargs):
+            binary, at = _field(func(self, *args, **kwargs), offset)
             dos = unpack("<I", binary)[0]
+            if raw_mode(self):
+                return dos
 
-            if dos == 0:
-                raise ValueError
-            ymdhms = (
-                ((dos & 0xFE000000) >> 25) + 1980,
-                ((dos & 0x01E00000) >> 21),
-                ((dos & 0x001F0000) >> 16),
-                ((dos & 0x0000F800) >> 11),
-                ((dos & 0x000007E0) >> 5),
-                ((dos & 0x0000001F) >> 0) * 2,
-            )
-
-            return datetime(*ymdhms, tzinfo=timezone.utc)
-        except ValueError:
-            if sys.version_info < (3, 8, 0):
-                # HACK for older versions for bytes.hex()
-                # https://docs.python.org/3.9/library/stdtypes.html?highlight=hex#bytes.hex
-                iterator = iter(binary.hex())
-                invalid_date = " ".join(a + b for a, b in zip(iterator, iterator))
-            else:
-                invalid_date = binary.hex(" ")
-            msg = "Invalid dostime: %s" % invalid_date
-            warnings.warn(msg)
-            return None
+            try:
+                return dostime_to_datetime(dos)
+            except ValueError:
+                msg = "Invalid dostime: %s" % _hex_bytes(binary)
+                self.ctx.report(INVALID_DOSTIME, msg, at)
+                return None
 
-    return inner
+        return inner
+
+    return outer
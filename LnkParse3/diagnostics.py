@@ -0,0 +1,93 @@
+from collections import Counter
+from collections import namedtuple
+
+"""
+Diagnostics are collected per parsed file in the parse context instead of
+being issued as warnings. Each one has a code, the offset in the file where
+it applies (None if unknown), and a message. Counts by code are kept for
+every diagnostic, the records themselves only up to a limit.
+
+The validation level applies to the checks of values which MUST be set
+(e.g. HeaderSize, reserved fields): "strict" raises `ValidationError`,
+"lenient" collects a diagnostic, "off" skips the checks entirely. Problems
+the parser recovers from (undecodable strings, invalid times, truncated
+structures) are always collected and never raised.
+
+Values are checked when they are read: the diagnostics cover the fields
+accessed so far (all of them after `get_json`), and a lazily parsed file
+raises in "strict" mode only when an invalid field is accessed.
+"""
+
+STRICT = "strict"
+LENIENT = "lenient"
+OFF = "off"
+
+VALIDATION_LEVELS = (STRICT, LENIENT, OFF)
+
+# Codes
+INVALID_VALUE = "invalid-value"
+INVALID_FILETIME = "invalid-filetime"
+INVALID_DOSTIME = "invalid-dostime"
+DECODING_ERROR = "decoding-error"
+TARGET_ERROR = "target-error"
+EXTRA_DATA_ERROR = "extra-data-error"
+LINK_INFO_ERROR = "link-info-error"
+
+DEFAULT_LIMIT = 100
+
+
+class Diagnostic(namedtuple("Diagnostic", ["code", "offset", "message"])):
+    __slots__ = ()
+
+    def __str__(self):
+        if self.offset is None:
+            return "%s: %s" % (self.code, self.message)
+        return "%s at 0x%x: %s" % (self.code, self.offset, self.message)
+
+
+class ValidationError(ValueError):
+    """
+    A value which MUST be set is not, in strict validation.
+    """
+
+    def __init__(self, diagnostic):
+        super().__init__(str(diagnostic))
+        self.diagnostic = diagnostic
+
+
+class Diagnostics:
+    """
+    Sink of the diagnostics of one file. Iterating yields the collected
+    `Diagnostic` records, `counts` is a `Counter` of all of them by code.
+    A field is checked each time it is read; a problem at a known offset
+    (in the file, so it identifies the field) is only collected once.
+    """
+
+    __slots__ = ("items", "counts", "limit", "_seen")
+
+    def __init__(self, limit=DEFAULT_LIMIT):
+        self.items = []
+        self.counts = Counter()
+        self.limit = limit
+        self._seen = set()
+
+    def add(self, code, message, offset=None):
+        if offset is not None:
+            if (code, offset) in self._seen:
+                return
+            self._seen.add((code, offset))
+        self.counts[code] += 1
+        if len(self.items) < self.limit:
+            self.items.append(Diagnostic(code, offset, message))
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __bool__(self):
+        return bool(self.counts)
@@ -1,5 +1,5 @@
-from struct import unpack
 from LnkParse3.extra.lnk_extra_base import LnkExtraBase
+from LnkParse3.layout import Field
 
 """
 ------------------------------------------------------------------
@@ -15,14 +15,10 @@ from LnkParse3.extra.lnk_extra_base import LnkExtraBase
 
 
 class CodePage(LnkExtraBase):
+    LAYOUT = LnkExtraBase.LAYOUT.extend([Field("code_page", 8, "I")])
+
     def name(self):
         return "CONSOLE_CODEPAGE_BLOCK"
 
     def code_page(self):
-        start, end = 8, 12
-        return unpack("<I", self._raw[start:end])[0]
-
-    def as_dict(self):
-        tmp = super().as_dict()
-        tmp["code_page"] = self.code_page()
-        return tmp
+        return self._value("code_page")
@@ -1,5 +1,6 @@
-from struct import unpack
 from LnkParse3.extra.lnk_extra_base import LnkExtraBase
+from LnkParse3.layout import Field
+from LnkParse3.layout import Text
 
 """
 ------------------------------------------------------------------
@@ -53,117 +54,94 @@ from LnkParse3.extra.lnk_extra_base import LnkExtraBase
 
 
 class Console(LnkExtraBase):
+    LAYOUT = LnkExtraBase.LAYOUT.extend(
+        [
+            Field("fill_attributes", 8, "H"),
+            Field("popup_fill_attributes", 10, "H"),
+            Field("screen_buffer_size_x", 12, "h"),
+            Field("screen_buffer_size_y", 14, "h"),
+            Field("window_size_x", 16, "h"),
+            Field("window_size_y", 18, "h"),
+            Field("window_origin_x", 20, "h"),
+            Field("window_origin_y", 22, "h"),
+            Field("font_size", 32, "I"),
+            Field("font_family", 36, "I"),
+            Field("font_weight", 40, "I"),
+            Text("face_name", 44, 64, unicode=True),
+            Field("cursor_size", 108, "I"),
+            Field("full_screen", 112, "I"),
+            Field("quick_edit", 116, "I"),
+            Field("insert_mode", 120, "I"),
+            Field("auto_position", 124, "I"),
+            Field("history_buffer_size", 128, "I"),
+            Field("number_of_history_buffers", 132, "I"),
+            Field("history_no_dup", 136, "I"),
+            Field("color_table", 140, "I"),
+        ]
+    )
+
     def name(self):
         return "CONSOLE_PROPERTIES_BLOCK"
 
     def fill_attributes(self):
-        start, end = 8, 10
-        return unpack("<H", self._raw[start:end])[0]
+        return self._value("fill_attributes")
 
     def popup_fill_attributes(self):
-        start, end = 10, 12
-        return unpack("<H", self._raw[start:end])[0]
+        return self._value("popup_fill_attributes")
 
     def screen_buffer_size_x(self):
-        start, end = 12, 14
-        return unpack("<h", self._raw[start:end])[0]
+        return self._value("screen_buffer_size_x")
 
     def screen_buffer_size_y(self):
-        start, end = 14, 16
-        return unpack("<h", self._raw[start:end])[0]
+        return self._value("screen_buffer_size_y")
 
     def window_size_x(self):
-        start, end = 16, 18
-        return unpack("<h", self._raw[start:end])[0]
+        return self._value("window_size_x")
 
     def window_size_y(self):
-        start, end = 18, 20
-        return unpack("<h", self._raw[start:end])[0]
+        return self._value("window_size_y")
 
     def window_origin_x(self):
-        start, end = 20, 22
-        return unpack("<h", self._raw[start:end])[0]
+        return self._value("window_origin_x")
 
     def window_origin_y(self):
-        start, end = 22, 24
-        return unpack("<h", self._raw[start:end])[0]
+        return self._value("window_origin_y")
 
     def font_size(self):
-        start, end = 32, 36
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("font_size")
 
     def font_family(self):
-        start, end = 36, 40
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("font_family")
 
     def font_weight(self):
-        start, end = 40, 44
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("font_weight")
 
     def face_name(self):
-        start = 44
-        end = start + 64
-        binary = self._raw[start:end]
-        text = self.text_processor.read_unicode_string(binary)
-        return text
+        return self._value("face_name")
 
     def cursor_size(self):
-        start, end = 108, 112
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("cursor_size")
 
     def full_screen(self):
-        start, end = 112, 116
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("full_screen")
 
     def quick_edit(self):
-        start, end = 116, 120
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("quick_edit")
 
     def insert_mode(self):
-        start, end = 120, 124
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("insert_mode")
 
     def auto_position(self):
-        start, end = 124, 128
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("auto_position")
 
     def history_buffer_size(self):
-        start, end = 128, 132
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("history_buffer_size")
 
     def number_of_history_buffers(self):
-        start, end = 132, 136
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("number_of_history_buffers")
 
     def history_no_dup(self):
-        start, end = 136, 140
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("history_no_dup")
 
     def color_table(self):
-        start, end = 140, 144
-        return unpack("<I", self._raw[start:end])[0]
-
-    def as_dict(self):
-        tmp = super().as_dict()
-        tmp["fill_attributes"] = self.fill_attributes()
-        tmp["popup_fill_attributes"] = self.popup_fill_attributes()
-        tmp["screen_buffer_size_x"] = self.screen_buffer_size_x()
-        tmp["screen_buffer_size_y"] = self.screen_buffer_size_y()
-        tmp["window_size_x"] = self.window_size_x()
-        tmp["window_size_y"] = self.window_size_y()
-        tmp["window_origin_x"] = self.window_origin_x()
-        tmp["window_origin_y"] = self.window_origin_y()
-        tmp["font_size"] = self.font_size()
-        tmp["font_family"] = self.font_family()
-        tmp["font_weight"] = self.font_weight()
-        tmp["face_name"] = self.face_name()
-        tmp["cursor_size"] = self.cursor_size()
-        tmp["full_screen"] = self.full_screen()
-        tmp["quick_edit"] = self.quick_edit()
-        tmp["insert_mode"] = self.insert_mode()
-        tmp["auto_position"] = self.auto_position()
-        tmp["history_buffer_size"] = self.history_buffer_size()
-        tmp["number_of_history_buffers"] = self.number_of_history_buffers()
-        tmp["history_no_dup"] = self.history_no_dup()
-        tmp["color_table"] = self.color_table()
-        return tmp
+        return self._value("color_table")
@@ -1,4 +1,5 @@
 from LnkParse3.extra.lnk_extra_base import LnkExtraBase
+from LnkParse3.layout import Text
 
 """
 ------------------------------------------------------------------
@@ -18,25 +19,18 @@ from LnkParse3.extra.lnk_extra_base import LnkExtraBase
 
 
 class Darwin(LnkExtraBase):
+    LAYOUT = LnkExtraBase.LAYOUT.extend(
+        [
+            Text("darwin_data_ansi", 8, 260),
+            Text("darwin_data_unicode", 268, 520, unicode=True),
+        ]
+    )
+
     def name(self):
         return "DARWIN_BLOCK"
 
     def darwin_data_ansi(self):
-        start = 8
-        end = start + 260
-        binary = self._raw[start:end]
-        text = self.text_processor.read_string(binary)
-        return text
+        return self._value("darwin_data_ansi")
 
     def darwin_data_unicode(self):
-        start = 268
-        end = start + 520
-        binary = self._raw[start:end]
-        text = self.text_processor.read_unicode_string(binary)
-        return text
-
-    def as_dict(self):
-        tmp = super().as_dict()
-        tmp["darwin_data_ansi"] = self.darwin_data_ansi()
-        tmp["darwin_data_unicode"] = self.darwin_data_unicode()
-        return tmp
+        return self._value("darwin_data_unicode")
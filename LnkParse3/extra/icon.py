@@ -1,4 +1,5 @@
 from LnkParse3.extra.lnk_extra_base import LnkExtraBase
+from LnkParse3.layout import Text
 
 """
 ------------------------------------------------------------------
@@ -18,25 +19,18 @@ from LnkParse3.extra.lnk_extra_base import LnkExtraBase
 
 
 class Icon(LnkExtraBase):
+    LAYOUT = LnkExtraBase.LAYOUT.extend(
+        [
+            Text("target_ansi", 8, 260),
+            Text("target_unicode", 268, 520, unicode=True),
+        ]
+    )
+
     def name(self):
         return "ICON_LOCATION_BLOCK"
 
     def target_ansi(self):
-        start = 8
-        end = start + 260
-        binary = self._raw[start:end]
-        text = self.text_processor.read_string(binary)
-        return text
+        return self._value("target_ansi")
 
     def target_unicode(self):
-        start = 268
-        end = start + 520
-        binary = self._raw[start:end]
-        text = self.text_processor.read_unicode_string(binary)
-        return text
-
-    def as_dict(self):
-        tmp = super().as_dict()
-        tmp["target_ansi"] = self.target_ansi()
-        tmp["target_unicode"] = self.target_unicode()
-        return tmp
+        return self._value("target_unicode")
@@ -1,6 +1,6 @@
-from struct import unpack
 from LnkParse3.extra.lnk_extra_base import LnkExtraBase
-from LnkParse3.decorators import uuid
+from LnkParse3.layout import Field
+from LnkParse3.decorators import format_uuid
 
 """
 ------------------------------------------------------------------
@@ -19,21 +19,18 @@ from LnkParse3.decorators import uuid
 
 
 class KnownFolder(LnkExtraBase):
+    LAYOUT = LnkExtraBase.LAYOUT.extend(
+        [
+            Field("known_folder_id", 8, "16s", format_uuid),
+            Field("offset", 24, "I"),
+        ]
+    )
+
     def name(self):
         return "KNOWN_FOLDER_LOCATION_BLOCK"
 
-    @uuid
     def known_folder_id(self):
-        start, end = 8, 24
-        binary = self._raw[start:end]
-        return binary
+        return self._value("known_folder_id")
 
     def offset(self):
-        start, end = 24, 28
-        return unpack("<I", self._raw[start:end])[0]
-
-    def as_dict(self):
-        tmp = super().as_dict()
-        tmp["known_folder_id"] = self.known_folder_id()
-        tmp["offset"] = self.offset()
-        return tmp
+        return self._value("offset")
@@ -1,5 +1,8 @@
-from struct import unpack
-from LnkParse3.text_processor import TextProcessor
+from LnkParse3.cursor import Cursor
+from LnkParse3.layout import Layout
+from LnkParse3.layout import Field
+from LnkParse3.metrics import timed
+from LnkParse3.parse_context import ParseContext
 
 """
 ------------------------------------------------------------------
@@ -11,16 +14,32 @@ from LnkParse3.text_processor import TextProcessor
 
 
 class LnkExtraBase:
-    def __init__(self, indata=None, cp=None):
-        self._raw = indata
-        self.text_processor = TextProcessor(cp=cp)
+    # Subclasses extend the layout with their own fields; `as_dict` and the
+    # accessors are served from a single decode of the whole layout.
+    LAYOUT = Layout([Field("size", 0, "I")])
+
+    def __init__(self, indata=None, cp=None, ctx=None):
+        self._raw = Cursor.wrap(indata)
+        self.ctx = ParseContext.ensure(ctx, cp)
+        self.text_processor = self.ctx.text_processor
+        self._values = None
+
+    def _decoded(self):
+        if self._values is None:
+            self._values = self._decode()
+        return self._values
+
+    @timed("extra.%s", lambda self: len(self._raw))
+    def _decode(self):
+        return self.LAYOUT.decode(self._raw, self.ctx)
+
+    def _value(self, name):
+        return self._decoded()[name]
 
     def size(self):
-        start, end = 0, 4
-        size = unpack("<I", self._raw[start:end])[0]
+        start = 0
+        size = self._raw.unpack("<I", start)[0]
         return size
 
     def as_dict(self):
-        return {
-            "size": self.size(),
-        }
+        return dict(self._decoded())
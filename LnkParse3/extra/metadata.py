@@ -1,6 +1,7 @@
 from struct import unpack
 from LnkParse3.extra.lnk_extra_base import LnkExtraBase
-from LnkParse3.decorators import uuid
+from LnkParse3.layout import Field
+from LnkParse3.decorators import format_uuid
 
 """
 ------------------------------------------------------------------
@@ -24,29 +25,25 @@ from LnkParse3.decorators import uuid
 
 
 class Metadata(LnkExtraBase):
+    LAYOUT = LnkExtraBase.LAYOUT.extend(
+        [
+            Field("storage_size", 8, "I"),
+            Field("version", 12, "I", hex),
+            Field("format_id", 16, "16s", format_uuid),
+        ]
+    )
+
     def name(self):
         return "METADATA_PROPERTIES_BLOCK"
 
     def storage_size(self):
-        start, end = 8, 12
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("storage_size")
 
     def version(self):
-        start, end = 12, 16
-        version = unpack("<I", self._raw[start:end])[0]
-        return hex(version)
+        return self._value("version")
 
-    @uuid
     def format_id(self):
-        start, end = 16, 32
-        return self._raw[start:end]
-
-    def as_dict(self):
-        tmp = super().as_dict()
-        tmp["storage_size"] = self.storage_size()
-        tmp["version"] = self.version()
-        tmp["format_id"] = self.format_id()
-        return tmp
+        return self._value("format_id")
 
     # TODO:
     def serialized_property_value(self):
@@ -1,4 +1,5 @@
 from LnkParse3.extra.lnk_extra_base import LnkExtraBase
+from LnkParse3.layout import Text
 
 """
 ------------------------------------------------------------------
@@ -15,16 +16,10 @@ from LnkParse3.extra.lnk_extra_base import LnkExtraBase
 
 
 class ShimLayer(LnkExtraBase):
+    LAYOUT = LnkExtraBase.LAYOUT.extend([Text("layer_name", 8)])
+
     def name(self):
         return "SHIM_LAYER_BLOCK"
 
     def layer_name(self):
-        start = 8
-        binary = self._raw[start:]
-        text = self.text_processor.read_string(binary)
-        return text
-
-    def as_dict(self):
-        tmp = super().as_dict()
-        tmp["layer_name"] = self.layer_name()
-        return tmp
+        return self._value("layer_name")
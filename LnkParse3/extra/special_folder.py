@@ -1,5 +1,5 @@
-from struct import unpack
 from LnkParse3.extra.lnk_extra_base import LnkExtraBase
+from LnkParse3.layout import Field
 
 """
 ------------------------------------------------------------------
@@ -17,19 +17,18 @@ from LnkParse3.extra.lnk_extra_base import LnkExtraBase
 
 
 class SpecialFolder(LnkExtraBase):
+    LAYOUT = LnkExtraBase.LAYOUT.extend(
+        [
+            Field("special_folder_id", 8, "I"),
+            Field("offset", 12, "I"),
+        ]
+    )
+
     def name(self):
         return "SPECIAL_FOLDER_LOCATION_BLOCK"
 
     def special_folder_id(self):
-        start, end = 8, 12
-        return unpack("<I", self._raw[start:end])[0]
+        return self._value("special_folder_id")
 
     def offset(self):
-        start, end = 12, 16
-        return unpack("<I", self._raw[start:end])[0]
-
-    def as_dict(self):
-        tmp = super().as_dict()
-        tmp["special_folder_id"] = self.special_folder_id()
-        tmp["offset"] = self.offset()
-        return tmp
+        return self._value("offset")
@@ -1,7 +1,10 @@
-import warnings
 from struct import error as StructError
 
+from LnkParse3.cursor import Cursor
+from LnkParse3.diagnostics import EXTRA_DATA_ERROR
 from LnkParse3.extra_factory import ExtraFactory
+from LnkParse3.metrics import timed
+from LnkParse3.parse_context import ParseContext
 
 """
 EXTRA_DATA:
@@ -10,35 +13,97 @@ Zero or more ExtraData structures (section 2.5).
 
 
 class ExtraData:
-    def __init__(self, indata=None, cp=None):
-        self.cp = cp
-        self._raw = indata
+    # TerminalBlock: BlockSize MUST be less than 0x00000004
+    TERMINAL_BLOCK_SIZE = 4
+
+    def __init__(self, indata=None, cp=None, ctx=None):
+        self.ctx = ParseContext.ensure(ctx, cp)
+        self._raw = Cursor.wrap(indata)
+        self._index = None
+        self._by_signature = None
+        self._blocks = {}
 
     def __iter__(self):
-        return self._iter()
+        return (self._block(position) for position in range(len(self._entries())))
+
+    def __contains__(self, signature):
+        self._entries()
+        return signature in self._by_signature
 
-    def _iter(self):
+    @timed("extras", lambda self: self._index[-1][2] if self._index else 0)
+    def _entries(self):
+        """
+        One pass over the block headers, (signature, start, end, class) of
+        every known block. Blocks themselves are created on demand.
+        """
+        if self._index is not None:
+            return self._index
+
+        index = []
+        by_signature = {}
         rest = self._raw
         while rest:
             factory = ExtraFactory(indata=rest)
             size = factory.item_size()
 
-            if not size:
+            if size < self.TERMINAL_BLOCK_SIZE:
                 break
 
+            # Narrows the window, no copy
+            start = rest.start - self._raw.start
             data, rest = rest[:size], rest[size:]
 
             cls = factory.extra_class()
             if cls:
-                yield cls(indata=data, cp=self.cp)
+                signature = factory.signature()
+                by_signature.setdefault(signature, len(index))
+                index.append((signature, start, start + len(data), cls))
+
+        self._index = index
+        self._by_signature = by_signature
+        return index
 
-    def as_dict(self):
+    def _block(self, position):
+        try:
+            return self._blocks[position]
+        except KeyError:
+            pass
+
+        _, start, end, cls = self._index[position]
+        block = cls(indata=self._raw[start:end], ctx=self.ctx)
+        self._blocks[position] = block
+        return block
+
+    def get(self, signature, default=None):
+        """
+        Block with the BlockSignature `signature` (e.g. 0xA0000003), or
+        `default`. Only this block is created and it is decoded lazily; if
+        the signature repeats, the first block is returned.
+        """
+        self._entries()
+        position = self._by_signature.get(signature)
+        if position is None:
+            return default
+        return self._block(position)
+
+    def as_dict(self, select=None):
+        """
+        Decoded blocks by name. With `select` (a dict of block names to None
+        for all fields, or to a collection of field names), only the selected
+        blocks are decoded.
+        """
         res = {}
         for extra in self:
+            name = extra.name()
+            if select is not None and name not in select:
+                continue
             try:
-                res[extra.name()] = extra.as_dict()
+                value = extra.as_dict()
+                if select is not None and select[name] is not None:
+                    value = {k: v for k, v in value.items() if k in select[name]}
+                res[name] = value
             except StructError as e:
-                msg = "Error while parsing `%s` (%s)" % (extra.name(), e)
-                warnings.warn(msg)
+                msg = "Error while parsing `%s` (%s)" % (name, e)
+                self.ctx.report(EXTRA_DATA_ERROR, msg, extra._raw.start)
                 continue
         return res
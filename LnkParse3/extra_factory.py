@@ -1,4 +1,4 @@
-from struct import unpack
+from LnkParse3.cursor import Cursor
 from LnkParse3.extra.environment import Environment
 from LnkParse3.extra.console import Console
 from LnkParse3.extra.distributed_tracker import DistributedTracker
@@ -24,32 +24,34 @@ from LnkParse3.extra.shell_item import ShellItem
 
 class ExtraFactory:
     EXTRA_SIGS = {
-        "a0000001": Environment,
-        "a0000002": Console,
-        "a0000003": DistributedTracker,
-        "a0000004": CodePage,
-        "a0000005": SpecialFolder,
-        "a0000006": Darwin,
-        "a0000007": Icon,
-        "a0000008": ShimLayer,
-        "a0000009": Metadata,
-        "a000000b": KnownFolder,
-        "a000000c": ShellItem,
+        0xA0000001: Environment,
+        0xA0000002: Console,
+        0xA0000003: DistributedTracker,
+        0xA0000004: CodePage,
+        0xA0000005: SpecialFolder,
+        0xA0000006: Darwin,
+        0xA0000007: Icon,
+        0xA0000008: ShimLayer,
+        0xA0000009: Metadata,
+        0xA000000B: KnownFolder,
+        0xA000000C: ShellItem,
     }
 
     def __init__(self, indata):
-        self._raw = indata
+        self._raw = Cursor.wrap(indata)
 
     def item_size(self):
-        start, end = 0, 4
-        size = unpack("<I", self._raw[start:end])[0]
+        start = 0
+        size = self._raw.unpack("<I", start)[0]
         return size
 
     def _rsig(self):
-        start, end = 4, 8
-        rsig = unpack("<I", self._raw[start:end])[0]
+        start = 4
+        rsig = self._raw.unpack("<I", start)[0]
         return rsig
 
+    def signature(self):
+        return self._rsig()
+
     def extra_class(self):
-        sig = str(hex(self._rsig()))[2:]  # huh?
-        return self.EXTRA_SIGS.get(sig)
+        return self.EXTRA_SIGS.get(self._rsig())
@@ -0,0 +1,194 @@
+"""
+Flag fields (LinkFlags, FileAttributes) are kept as plain integers. Testing
+a bit is a single `&`; the list of flag names is built only when it is
+requested (e.g. for the JSON output).
+"""
+
+
+class Flags(int):
+    __slots__ = ()
+
+    # {mask: name}
+    MASK = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ITEMS = sorted(cls.MASK.items())
+        cls._BITS = {name: mask for mask, name in cls.MASK.items()}
+
+    def __contains__(self, name):
+        return bool(self & self._BITS.get(name, 0))
+
+    def names(self):
+        return [name for mask, name in self._ITEMS if self & mask]
+
+
+class LinkFlags(Flags):
+    HAS_TARGET_ID_LIST = 0x00000001
+    HAS_LINK_INFO = 0x00000002
+    HAS_NAME = 0x00000004
+    HAS_RELATIVE_PATH = 0x00000008
+    HAS_WORKING_DIR = 0x00000010
+    HAS_ARGUMENTS = 0x00000020
+    HAS_ICON_LOCATION = 0x00000040
+    IS_UNICODE = 0x00000080
+    FORCE_NO_LINK_INFO = 0x00000100
+
+    MASK = {  # {{{
+        # LinkTargetIDList structure (section 2.2) MUST follow the
+        # ShellLinkHeader. If this bit is not set, this structure MUST NOT
+        # be present.
+        0x00000001: "HasTargetIDList",
+        # The shell link is saved with link information. If this bit is set,
+        # a LinkInfo structure (section 2.3) MUST be present. If this bit
+        # is not set, this structure MUST NOT be present.
+        0x00000002: "HasLinkInfo",
+        # The shell link is saved with a name string. If this bit is set,
+        # a NAME_STRING StringData structure (section 2.4) MUST be present.
+        # If this bit is not set, this structure MUST NOT be present.
+        0x00000004: "HasName",
+        # The shell link is saved with a relative path string. If this bit
+        # is set, a RELATIVE_PATH StringData structure (section 2.4) MUST
+        # be present. If this bit is not set, this structure MUST NOT be
+        # present.
+        0x00000008: "HasRelativePath",
+        # The shell link is saved with a working directory string. If this
+        # bit is set, a WORKING_DIR StringData structure (section 2.4) MUST
+        # be present. If this bit is not set, this structure MUST NOT be
+        # present.
+        0x00000010: "HasWorkingDir",
+        # The shell link is saved with command line arguments. If this bit
+        # is set, a COMMAND_LINE_ARGUMENTS StringData structure (section
+        # 2.4) MUST be present. If this bit is not set, this structure MUST
+        # NOT be present.
+        0x00000020: "HasArguments",
+        # The shell link is saved with an icon location string. If this bit
+        # is set, an ICON_LOCATION StringData structure (section 2.4) MUST
+        # be present. If this bit is not set, this structure MUST NOT be
+        # present.
+        0x00000040: "HasIconLocation",
+        # The shell link contains Unicode encoded strings. This bit SHOULD
+        # be set. If this bit is set, the StringData section contains
+        # Unicode-encoded strings; otherwise, it contains strings that are
+        # encoded using the system default code page.
+        0x00000080: "IsUnicode",
+        # The LinkInfo structure (section 2.3) is ignored.
+        0x00000100: "ForceNoLinkInfo",
+        # The shell link is saved with an EnvironmentVariableDataBlock
+        # (section 2.5.4).
+        0x00000200: "HasExpString",
+        # The target is run in a separate virtual machine when launching
+        # a link target that is a 16-bit application.
+        0x00000400: "RunInSeparateProcess",
+        # TODO: Unused1
+        # A bit that is undefined and MUST be ignored.
+        0x00000800: "Reserved0",
+        # The shell link is saved with a DarwinDataBlock (section 2.5.3).
+        0x00001000: "HasDarwinID",
+        # The application is run as a different user when the target of the
+        # shell link is activated.
+        0x00002000: "RunAsUser",
+        # The shell link is saved with an IconEnvironmentDataBlock (section
+        # 2.5.5).
+        0x00004000: "HasExpIcon",
+        # The file system location is represented in the shell namespace
+        # when the path to an item is parsed into an IDList.
+        0x00008000: "NoPidlAlias",
+        # TODO: Unused2
+        # A bit that is undefined and MUST be ignored.
+        0x00010000: "Reserved1",
+        # The shell link is saved with a ShimDataBlock (section 2.5.8).
+        0x00020000: "RunWithShimLayer",
+        # The TrackerDataBlock (section 2.5.10) is ignored.
+        0x00040000: "ForceNoLinkTrack",
+        # The shell link attempts to collect target properties and store
+        # them in the PropertyStoreDataBlock (section 2.5.7) when the link
+        # target is set.
+        0x00080000: "EnableTargetMetadata",
+        # The EnvironmentVariableDataBlock is ignored.
+        0x00100000: "DisableLinkPathTracking",
+        # The SpecialFolderDataBlock (section 2.5.9) and the
+        # KnownFolderDataBlock (section 2.5.6) are ignored when loading the
+        # shell link. If this bit is set, these extra data blocks SHOULD
+        # NOT be saved when saving the shell link.
+        0x00200000: "DisableKnownFolderTracking",
+        # If the link has a KnownFolderDataBlock (section 2.5.6), the
+        # unaliased form of the known folder IDList SHOULD be used when
+        # translating the target IDList at the time that the link is
+        # loaded.
+        0x00400000: "DisableKnownFolderAlias",
+        # Creating a link that references another link is enabled.
+        # Otherwise, specifying a link as the target IDList SHOULD NOT be
+        # allowed.
+        0x00800000: "AllowLinkToLink",
+        # When saving a link for which the target IDList is under a known
+        # folder, either the unaliased form of that known folder or the
+        # target IDList SHOULD be used.
+        0x01000000: "UnaliasOnSave",
+        # The target IDList SHOULD NOT be stored; instead, the path
+        # specified in the 2.1.2 FileAttributesFlags
+        # EnvironmentVariableDataBlock (section 2.5.4) SHOULD be used to
+        # refer to the target.
+        0x02000000: "PreferEnvironmentPath",
+        # When the target is a UNC name that refers to a location on
+        # a local machine, the local path IDList in the
+        # PropertyStoreDataBlock (section 2.5.7) SHOULD be stored, so it
+        # can be used when the link is loaded on the local machine.
+        0x04000000: "KeepLocalIDListForUNCTarget",
+    }  # }}}
+
+
+class FileAttributes(Flags):
+    MASK = {  # {{{
+        # The file or directory is read-only. For a file, if this bit is set,
+        # applications can read the file but cannot write to it or delete it.
+        # For a directory, if this bit is set, applications cannot delete the
+        # directory.
+        0x00000001: "FILE_ATTRIBUTE_READONLY",
+        # The file or directory is hidden. If this bit is set, the file or
+        # folder is not included in an ordinary directory listing.
+        0x00000002: "FILE_ATTRIBUTE_HIDDEN",
+        # The file or directory is part of the operating system or is used
+        # exclusively by the operating system.
+        0x00000004: "FILE_ATTRIBUTE_SYSTEM",
+        # TODO: Reserved1
+        # A bit that MUST be zero.
+        0x00000008: "Reserved, not used by the LNK format",
+        # The link target is a directory instead of a file.
+        0x00000010: "FILE_ATTRIBUTE_DIRECTORY",
+        # The file or directory is an archive file. Applications use this flag
+        # to mark files for backup or removal.
+        0x00000020: "FILE_ATTRIBUTE_ARCHIVE",
+        # A bit that MUST be zero.
+        0x00000040: "FILE_ATTRIBUTE_DEVICE",
+        # The file or directory has no other flags set. If this bit is 1, all
+        # other bits in this structure MUST be clear.
+        0x00000080: "FILE_ATTRIBUTE_NORMAL",
+        # The file is being used for temporary storage.
+        0x00000100: "FILE_ATTRIBUTE_TEMPORARY",
+        # The file is a sparse file.
+        0x00000200: "FILE_ATTRIBUTE_SPARSE_FILE",
+        # The file or directory has an associated reparse point.
+        0x00000400: "FILE_ATTRIBUTE_REPARSE_POINT",
+        # The file or directory is compressed. For a file, this means that all
+        # data in the file is compressed. For a directory, this means that
+        # compression is the default for newly created files and
+        # subdirectories.
+        0x00000800: "FILE_ATTRIBUTE_COMPRESSED",
+        # The data of the file is not immediately available.
+        0x00001000: "FILE_ATTRIBUTE_OFFLINE",
+        # The contents of the file need to be indexed.
+        0x00002000: "FILE_ATTRIBUTE_NOT_CONTENT_INDEXED",
+        # The file or directory is encrypted. For a file, this means that all
+        # data in the file is encrypted. For a directory, this means that
+        # encryption is the default for newly created files and subdirectories.
+        0x00004000: "FILE_ATTRIBUTE_ENCRYPTED",
+        # The directory or user data stream is configured with integrity
+        # (only supported on ReFS volumes).
+        0x00008000: "FILE_ATTRIBUTE_INTEGRITY_STREAM",
+        # Is virtual
+        0x00010000: "FILE_ATTRIBUTE_VIRTUAL",
+        # The user data stream not to be read by the background data
+        # integrity scanner (AKA scrubber).
+        0x00020000: "FILE_ATTRIBUTE_NO_SCRUB_DATA",
+    }  # }}}
@@ -1,5 +1,10 @@
-from struct import unpack
+from struct import Struct
+from struct import error as StructError
+
+from LnkParse3.decorators import formatted
+from LnkParse3.diagnostics import LINK_INFO_ERROR
 from LnkParse3.lnk_info import LnkInfo
+from LnkParse3.metrics import timed
 
 """
 ------------------------------------------------------------------
@@ -21,6 +26,49 @@ from LnkParse3.lnk_info import LnkInfo
 """
 
 
+class VolumeID:
+    """
+    Decoded VolumeID structure (section 2.3.1), with the volume label.
+    Absent fields are None.
+    """
+
+    __slots__ = (
+        "size",
+        "drive_type",
+        "drive_serial_number",
+        "volume_label_offset",
+        "volume_label_offset_unicode",
+        "volume_label",
+        "volume_label_unicode",
+    )
+
+    STRUCT = Struct("<4I")
+
+    def __init__(self, raw, text_processor):
+        (
+            self.size,
+            self.drive_type,
+            self.drive_serial_number,
+            self.volume_label_offset,
+        ) = raw.unpack(self.STRUCT)
+
+        self.volume_label_offset_unicode = None
+        self.volume_label = None
+        self.volume_label_unicode = None
+
+        # VolumeLabelOffset == 0x14 means the label is in Unicode
+        if self.volume_label_offset == 0x00000014:
+            self.volume_label_offset_unicode = raw.unpack("<I", 16)[0]
+            if self.volume_label_offset_unicode:
+                self.volume_label_unicode = text_processor.read_unicode_string(
+                    raw[self.volume_label_offset_unicode :]
+                )
+        else:
+            self.volume_label = text_processor.read_string(
+                raw[self.volume_label_offset :]
+            )
+
+
 class Local(LnkInfo):
     DRIVE_TYPES = [
         "DRIVE_UNKNOWN",
@@ -32,12 +80,59 @@ class Local(LnkInfo):
         "DRIVE_RAMDISK",
     ]
 
+    # LocalBasePathOffsetUnicode, CommonPathSuffixOffsetUnicode
+    UNICODE_OFFSETS = Struct("<II")
+
+    def __init__(self, indata=None, cp=None, ctx=None):
+        super().__init__(indata=indata, cp=cp, ctx=ctx)
+        self._volume = None
+        self._strings = None
+
     def _has_opt_fields(self):
         """
         Offsets to the optional fields are specified.
         """
         return bool(self.header_size() >= 0x00000024)
 
+    def _volume_id(self):
+        """
+        VolumeID, decoded on the first access.
+        """
+        if self._volume is None:
+            self._volume = self._decode_volume_id()
+        return self._volume
+
+    @timed("link_info")
+    def _decode_volume_id(self):
+        start = self.volume_id_offset()
+        return VolumeID(self._raw[start:], self.text_processor)
+
+    def _paths(self):
+        """
+        (LocalBasePath, CommonPathSuffix, LocalBasePathOffsetUnicode,
+        LocalBasePathUnicode, CommonPathSuffixUnicode), decoded on the first
+        access. The ANSI strings are read only without the optional fields,
+        the Unicode ones only with them.
+        """
+        if self._strings is None:
+            self._strings = self._decode_paths()
+        return self._strings
+
+    @timed("link_info")
+    def _decode_paths(self):
+        read_string = self.text_processor.read_string
+        read_unicode_string = self.text_processor.read_unicode_string
+
+        if not self._has_opt_fields():
+            lbp = read_string(self._raw[self.local_base_path_offset() :])
+            cps = read_string(self._raw[self.common_path_suffix_offset() :])
+            return (lbp, cps, None, None, None)
+
+        lbp_offset, cps_offset = self._raw.unpack(self.UNICODE_OFFSETS, 28)
+        lbp = read_unicode_string(self._raw[lbp_offset:])
+        cps = read_unicode_string(self._raw[cps_offset:])
+        return (None, None, lbp_offset, lbp, cps)
+
     def local_base_path_offset_unicode(self):
         """LocalBasePathOffsetUnicode (4 bytes):
         An optional, 32-bit, unsigned integer that specifies the location of
@@ -47,23 +142,17 @@ class Local(LnkInfo):
         can be present only if the value of the LinkInfoHeaderSize field is
         greater than or equal to 0x00000024.
         """
-        if not self._has_opt_fields():
-            return None
-        (lbp, cps) = self._opt_fields()
-        return lbp
+        return self._paths()[2]
 
     def common_path_suffix_unicode(self):
-        """CommonPathSuffixOffsetUnicode (4 bytes):
-        An optional, 32-bit, unsigned integer that specifies the location of
-        the CommonPathSuffixUnicode field. This value is an offset, in bytes,
-        from the start of the LinkInfo structure. This field can be present
-        only if the value of the LinkInfoHeaderSize field is greater than or
-        equal to 0x00000024.
+        """CommonPathSuffixUnicode (variable):
+        An optional, NULL-terminated, Unicode string that is used to construct
+        the full path to the link item or link target by being appended to
+        the string in the LocalBasePathUnicode field. This field can be
+        present only if the value of the LinkInfoHeaderSize field is greater
+        than or equal to 0x00000024.
         """
-        if not self._has_opt_fields():
-            return None
-        (lbp, cps) = self._opt_fields()
-        return cps
+        return self._paths()[4]
 
     def volume_id(self):
         """VolumeID (variable):
@@ -71,25 +160,11 @@ class Local(LnkInfo):
         information about the volume that the link target was on when the
         link was created. This field is present if the
         VolumeIDAndLocalBasePath flag is set.
-        """
-        # TODO:
-        pass
 
-    def _opt_fields(self):
-        if not self._has_opt_fields():
-            return None
-
-        start, end = 28, 36
-        (lbp_offset, cps_offset) = unpack("<II", self._raw[start:end])
-        cps_offset += lbp_offset
-
-        lbp_binary = self._raw[lbp_offset:]
-        cps_binary = self._raw[cps_offset:]
-
-        lbp = self.text_processor.read_unicode_string(lbp_binary)
-        cps = self.text_processor.read_unicode_string(cps_binary)
-
-        return (lbp, cps)
+        Returns the decoded `VolumeID`, its fields are read through the
+        accessors of this class (e.g. `drive_type`).
+        """
+        return self._volume_id()
 
     def local_base_path(self):
         """LocalBasePath (variable):
@@ -98,19 +173,28 @@ class Local(LnkInfo):
         or link target by appending the string in the CommonPathSuffix field.
         This field is present if the VolumeIDAndLocalBasePath flag is set.
         """
-        if self._has_opt_fields():
-            return None
-        (lbp, cps) = self._non_opt_fields()
-        return lbp
+        return self._paths()[0]
 
     def common_network_relative_link(self):
         """CommonNetworkRelativeLink (variable):
         An optional CommonNetworkRelativeLink structure (section 2.3.2) that
         specifies information about the network location where the link
         target is stored.
+
+        Returns the decoded `CommonNetworkRelativeLink`, or None if it is
+        absent or cannot be decoded. Its fields are read through the
+        accessors of `LnkInfo` (e.g. `net_name`).
         """
-        # TODO:
-        pass
+        # CommonNetworkRelativeLinkAndPathSuffix
+        if not self.flags() & 0x0002 or not self.common_network_relative_link_offset():
+            return None
+        try:
+            return self._common_network_relative_link()
+        except (StructError, UnicodeDecodeError) as e:
+            msg = "Error while parsing `CommonNetworkRelativeLink` (%s)" % e
+            offset = self._raw.start + self.common_network_relative_link_offset()
+            self.ctx.report(LINK_INFO_ERROR, msg, offset)
+            return None
 
     def common_path_suffix(self):
         """CommonPathSuffix (variable):
@@ -118,48 +202,23 @@ class Local(LnkInfo):
         which is used to construct the full path to the link item or link
         target by being appended to the string in the LocalBasePath field.
         """
-        if self._has_opt_fields():
-            return None
-        (lbp, cps) = self._non_opt_fields()
-        return cps
-
-    def _non_opt_fields(self):
-        (lbp_offset, cps_offset) = (
-            self.local_base_path_offset(),
-            self.common_path_suffix_offset(),
-        )
-
-        lbp_binary = self._raw[lbp_offset:]
-        cps_binary = self._raw[cps_offset:]
-
-        lbp = self.text_processor.read_string(lbp_binary)
-        cps = self.text_processor.read_string(cps_binary)
-
-        return (lbp, cps)
+        return self._paths()[1]
 
     def location(self):
         return "Local"
 
     def volume_id_size(self):
-        start = self.volume_id_offset()
-        end = start + 4
-        return unpack("<I", self._raw[start:end])[0]
+        return self._volume_id().size
 
     def r_drive_type(self):
-        start = self.volume_id_offset() + 4
-        end = start + 4
-        return unpack("<I", self._raw[start:end])[0]
+        return self._volume_id().drive_type
 
+    @formatted(hex)
     def drive_serial_number(self):
-        start = self.volume_id_offset() + 8
-        end = start + 4
-        number = unpack("<I", self._raw[start:end])[0]
-        return hex(number)
+        return self._volume_id().drive_serial_number
 
     def volume_label_offset(self):
-        start = self.volume_id_offset() + 12
-        end = start + 4
-        return unpack("<I", self._raw[start:end])[0]
+        return self._volume_id().volume_label_offset
 
     def drive_type(self):
         if self.r_drive_type() < len(self.DRIVE_TYPES):
@@ -167,41 +226,14 @@ class Local(LnkInfo):
         else:
             return None
 
-    def _has_volume_label_offset_unicode(self):
-        return bool(self.volume_label_offset() == 0x00000014)
-
     def volume_label(self):
-        if self._has_volume_label_offset_unicode():
-            return None
-        else:
-            start = self.volume_id_offset() + self.volume_label_offset()
-            binary = self._raw[start:]
-            text = self.text_processor.read_string(binary)
-            return text
+        return self._volume_id().volume_label
 
     def volume_label_unicode_offset(self):
-        if not self._has_volume_label_offset_unicode():
-            return None
-        else:
-            start = self.volume_id_offset() + 16
-            end = start + 4
-            offset = unpack("<I", self._raw[start:end])[0]
-            return offset
+        return self._volume_id().volume_label_offset_unicode
 
     def volume_label_unicode(self):
-        if self.volume_label_unicode_offset():
-            start = self.volume_id_offset() + 16
-            offset = start + self.volume_label_unicode_offset()
-            binary = self._raw[offset:]
-            text = self.text_processor.read_unicode_string(binary)
-            return text
-        else:
-            # TODO:
-            return None
-
-            start = self.volume_id_offset() + 16
-            end = start + 4
-            offset = unpack("<I", self._raw[start:end])[0]
+        return self._volume_id().volume_label_unicode
 
     def local_base_unicode(self):
         """LocalBasePathUnicode (variable):
@@ -211,5 +243,4 @@ class Local(LnkInfo):
         if the VolumeIDAndLocalBasePath flag is set and the value of the
         LinkInfoHeaderSize field is greater than or equal to 0x00000024.
         """
-        # TODO:
-        pass
+        return self._paths()[3]
@@ -0,0 +1,98 @@
+from struct import Struct
+
+from LnkParse3.diagnostics import OFF
+
+"""
+Declarative layouts of (mostly) fixed structures. A layout is a table of
+fields; all binary fields are compiled into a single `struct.Struct` (gaps
+become pad bytes), so a whole structure is decoded by one `unpack_from`
+call followed by cheap converters. Strings are decoded separately by the
+text processor of the parse context.
+"""
+
+
+class Field:
+    """
+    Binary field: `code` is a struct format character (e.g. "I", "h", "16s").
+    `convert` is applied to the unpacked value (not in raw mode); `expected`
+    is the value the field MUST have (a diagnostic is reported otherwise).
+    """
+
+    __slots__ = ("name", "offset", "code", "convert", "expected")
+
+    def __init__(self, name, offset, code, convert=None, expected=None):
+        self.name = name
+        self.offset = offset
+        self.code = code
+        self.convert = convert
+        self.expected = expected
+
+    def size(self):
+        return Struct("<" + self.code).size
+
+
+class Text:
+    """
+    Null-terminated string in a field of `size` bytes (to the end of the
+    structure if `size` is None).
+    """
+
+    __slots__ = ("name", "offset", "size", "unicode")
+
+    def __init__(self, name, offset, size=None, unicode=False):
+        self.name = name
+        self.offset = offset
+        self.size = size
+        self.unicode = unicode
+
+
+class Layout:
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+
+        binary = sorted(
+            (f for f in self.fields if isinstance(f, Field)), key=lambda f: f.offset
+        )
+
+        fmt, end = "<", 0
+        for field in binary:
+            if field.offset < end:
+                raise ValueError("Field `%s` overlaps previous field" % field.name)
+            if field.offset > end:
+                fmt += "%dx" % (field.offset - end)
+            fmt += field.code
+            end = field.offset + field.size()
+
+        self.struct = Struct(fmt)
+        self._binary = tuple(binary)
+        self._texts = tuple(f for f in self.fields if isinstance(f, Text))
+
+    def extend(self, fields):
+        return Layout(self.fields + tuple(fields))
+
+    def decode(self, cursor, ctx):
+        """
+        Decode all fields of the layout into a dict ordered as the table.
+        Raises `struct.error` when the data are too short.
+        """
+        values = {}
+        raw = ctx.raw
+        check = ctx.validation != OFF
+        for field, value in zip(self._binary, cursor.unpack(self.struct)):
+            if check and field.expected is not None and value != field.expected:
+                offset = cursor.start + field.offset
+                ctx.invalid(field.name, field.expected, value, offset)
+            if field.convert is not None and not raw:
+                value = field.convert(value)
+            values[field.name] = value
+
+        text_processor = ctx.text_processor
+        for field in self._texts:
+            end = None if field.size is None else field.offset + field.size
+            binary = cursor[field.offset : end]
+            if field.unicode:
+                values[field.name] = text_processor.read_unicode_string(binary)
+            else:
+                values[field.name] = text_processor.read_string(binary)
+
+        return {field.name: values[field.name] for field in self.fields}
@@ -0,0 +1,272 @@
+from array import array
+from itertools import compress
+from struct import Struct
+
+from LnkParse3.decorators import EPOCH_AS_FILETIME
+from LnkParse3.decorators import HUNDREDS_OF_NANOSECONDS
+from LnkParse3.decorators import datetime_to_filetime
+from LnkParse3.flags import FileAttributes
+from LnkParse3.flags import LinkFlags
+from LnkParse3.lnk_header import LnkHeader
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""
+ShellLinkHeaders of many files held column-wise, for analytics over
+a corpus. Headers are queued as raw bytes and decoded all at once on the
+first access to a column; each column is an `array.array` (a NumPy array
+if NumPy is installed). Flag tests, FILETIME conversion and time windows
+run over whole columns and return masks, which select files with `filter`.
+No per-file objects are created.
+"""
+
+
+class StringColumn:
+    """
+    Strings stored in one buffer and indexed by offsets. A `str` is created
+    only when a string is read.
+    """
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+
+    def append(self, text):
+        self.data += text.encode("utf-8", "surrogateescape")
+        self.offsets.append(len(self.data))
+
+    def take(self, indexes):
+        """
+        New column of the strings at `indexes`, copied without decoding.
+        """
+        column = StringColumn()
+        for index in indexes:
+            column.data += self.data[self.offsets[index] : self.offsets[index + 1]]
+            column.offsets.append(len(column.data))
+        return column
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("StringColumn index out of range")
+        binary = self.data[self.offsets[index] : self.offsets[index + 1]]
+        return binary.decode("utf-8", "surrogateescape")
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class LnkBatch:
+    # (name, array type code) in the order of STRUCT
+    COLUMNS = (
+        ("link_flags", "I"),
+        ("file_attributes", "I"),
+        ("creation_time", "q"),
+        ("access_time", "q"),
+        ("write_time", "q"),
+        ("file_size", "I"),
+        ("icon_index", "i"),
+        ("show_command", "i"),
+        ("hot_key", "H"),
+    )
+
+    # ShellLinkHeader without HeaderSize, LinkCLSID and the reserved fields,
+    # FILETIMEs as integers
+    STRUCT = Struct("<20x" + "".join(code for _, code in COLUMNS) + "10x")
+
+    FLAGS = {"link_flags": LinkFlags, "file_attributes": FileAttributes}
+
+    def __init__(self, use_numpy=None):
+        """
+        With `use_numpy` None, NumPy is used if it is installed. Columns
+        and masks are then NumPy arrays; otherwise columns are
+        `array.array` and masks are lists.
+        """
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError("NumPy is not installed")
+        self.use_numpy = use_numpy
+
+        self.paths = StringColumn()
+        # (path, error) of the files which were not added
+        self.errors = []
+        self._pending = bytearray()
+        self._columns = {name: self._empty(code) for name, code in self.COLUMNS}
+
+    @classmethod
+    def from_paths(cls, paths, use_numpy=None):
+        """
+        Read the ShellLinkHeader of each of `paths`. Files which cannot be
+        read or are not shell links are listed in `errors`.
+        """
+        batch = cls(use_numpy)
+        for path in paths:
+            try:
+                with open(path, "rb") as fhandle:
+                    batch.append(path, fhandle.read(cls.STRUCT.size))
+            except (OSError, ValueError) as e:
+                batch.errors.append((path, "%s: %s" % (type(e).__name__, e)))
+        return batch
+
+    def append(self, path, data):
+        """
+        Add the file `path` with its `data` (bytes, of which only the
+        ShellLinkHeader is used). Raises `ValueError` if it is not a shell
+        link.
+        """
+        header = bytes(data[: self.STRUCT.size])
+        if len(header) < self.STRUCT.size or not LnkHeader.is_lnk_magic(header):
+            raise ValueError("Not a shell link")
+        self.paths.append(path)
+        self._pending += header
+
+    def _empty(self, code):
+        if self.use_numpy:
+            return numpy.empty(0, dtype=code)
+        return array(code)
+
+    def _dtype(self):
+        names, formats, offsets = [], [], []
+        offset = 20
+        for name, code in self.COLUMNS:
+            names.append(name)
+            formats.append("<" + code)
+            offsets.append(offset)
+            offset += Struct("<" + code).size
+        return numpy.dtype(
+            {
+                "names": names,
+                "formats": formats,
+                "offsets": offsets,
+                "itemsize": self.STRUCT.size,
+            }
+        )
+
+    def _decode(self):
+        # All queued headers at once, no Python code per file
+        if not self._pending:
+            return
+
+        if self.use_numpy:
+            records = numpy.frombuffer(bytes(self._pending), dtype=self._dtype())
+            for name, code in self.COLUMNS:
+                column = records[name].astype(code)
+                self._columns[name] = numpy.concatenate((self._columns[name], column))
+        else:
+            rows = zip(*self.STRUCT.iter_unpack(self._pending))
+            for (name, _), values in zip(self.COLUMNS, rows):
+                self._columns[name].extend(values)
+
+        self._pending = bytearray()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        """
+        Raw values of one file as a dict.
+        """
+        self._decode()
+        row = {"path": self.paths[index]}
+        for name, _ in self.COLUMNS:
+            row[name] = int(self._columns[name][index])
+        return row
+
+    def column(self, name):
+        self._decode()
+        return self._columns[name]
+
+    def has_flag(self, name):
+        """
+        Mask of the files with the LinkFlags or FileAttributes flag `name`
+        (e.g. "RunAsUser", "FILE_ATTRIBUTE_HIDDEN").
+        """
+        for column, flags in self.FLAGS.items():
+            bit = flags._BITS.get(name)
+            if bit is not None:
+                break
+        else:
+            raise KeyError(name)
+
+        values = self.column(column)
+        if self.use_numpy:
+            return (values & bit) != 0
+        return [bool(value & bit) for value in values]
+
+    def flag_masks(self, column="link_flags"):
+        """
+        Flag column `column` expanded into {flag name: mask}.
+        """
+        return {name: self.has_flag(name) for _, name in self.FLAGS[column]._ITEMS}
+
+    def epoch(self, name):
+        """
+        FILETIME column `name` as seconds since the Unix epoch (floats, NaN
+        where the time is not set).
+        """
+        values = self.column(name)
+        if self.use_numpy:
+            # Whole seconds apart, int64 does not fit into float64 exactly
+            seconds, rest = numpy.divmod(
+                values - EPOCH_AS_FILETIME, HUNDREDS_OF_NANOSECONDS
+            )
+            seconds = seconds + rest / HUNDREDS_OF_NANOSECONDS
+            seconds[values == 0] = numpy.nan
+            return seconds
+
+        nan = float("nan")
+        return [
+            (value - EPOCH_AS_FILETIME) / HUNDREDS_OF_NANOSECONDS if value else nan
+            for value in values
+        ]
+
+    def time_between(self, name, start=None, end=None):
+        """
+        Mask of the files whose FILETIME `name` is in [`start`, `end`)
+        (datetimes, naive ones are taken as UTC). Times which are not set
+        never match.
+        """
+        low = 1 if start is None else max(datetime_to_filetime(start), 1)
+        high = None if end is None else datetime_to_filetime(end)
+
+        values = self.column(name)
+        if self.use_numpy:
+            mask = values >= low
+            if high is not None:
+                mask &= values < high
+            return mask
+
+        if high is None:
+            return [value >= low for value in values]
+        return [low <= value < high for value in values]
+
+    def filter(self, mask):
+        """
+        New batch of the files selected by `mask` (e.g. from `has_flag`).
+        """
+        self._decode()
+        batch = type(self)(self.use_numpy)
+
+        if self.use_numpy:
+            mask = numpy.asarray(mask, dtype=bool)
+            for name, _ in self.COLUMNS:
+                batch._columns[name] = self._columns[name][mask]
+            indexes = numpy.flatnonzero(mask).tolist()
+        else:
+            for name, code in self.COLUMNS:
+                batch._columns[name] = array(code, compress(self._columns[name], mask))
+            indexes = compress(range(len(self)), mask)
+
+        batch.paths = self.paths.take(indexes)
+        return batch
@@ -6,86 +6,386 @@ __version__ = "1.0.0"
 
 import json
 import datetime
-import argparse
+import sys
 from subprocess import list2cmdline
 
+from LnkParse3.cursor import map_file
+from LnkParse3.diagnostics import LENIENT
+from LnkParse3.flags import LinkFlags
 from LnkParse3.lnk_header import LnkHeader
 from LnkParse3.lnk_targets import LnkTargets
 from LnkParse3.lnk_info import LnkInfo
+from LnkParse3.metrics import stage
 from LnkParse3.info_factory import InfoFactory
 from LnkParse3.string_data import StringData
 from LnkParse3.extra_data import ExtraData
+from LnkParse3.parse_context import ParseContext
+from LnkParse3.stream import BufferSource
+from LnkParse3.stream import read_structure
+from LnkParse3.stream import structure_size
+
+
+def datetime_to_str(obj):
+    if isinstance(obj, datetime.datetime):
+        return obj.replace(microsecond=0).isoformat()
+    return obj
+
+
+def json_default(obj):
+    # GUIDs are bytes in raw mode
+    if isinstance(obj, bytes):
+        return obj.hex()
+    return datetime_to_str(obj)
+
+
+# Field scopes of `_json_fields`
+ALWAYS = 0
+ALL_ONLY = 1  # only with `get_all`
+TRUTHY = 2  # only if the value is truthy
+TIME = 3  # a datetime
+
+
+def _json_fields(obj, fields, get_all, fmt=None, select=None):
+    res = {}
+    for key, accessor, scope in fields:
+        if select is not None:
+            if key not in select:
+                continue
+        elif scope == ALL_ONLY and not get_all:
+            continue
+        value = getattr(obj, accessor)()
+        if scope == TRUTHY and not value:
+            continue
+        if scope == TIME and fmt is not None:
+            value = fmt(value)
+        res[key] = value
+    return res
+
+
+def select_fields(fields):
+    """
+    Tree of the dotted paths in `fields`, e.g. ["header.file_size", "data"]
+    gives {"header": {"file_size": None}, "data": None}. None stands for
+    everything below.
+    """
+    tree = {}
+    for field in fields:
+        node = tree
+        *parents, leaf = field.split(".")
+        for part in parents:
+            if part in node and node[part] is None:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _selected(select, key):
+    return select is None or key in select
+
+
+def _below(select, key):
+    return None if select is None else select[key]
+
+
+# (key, accessor, scope) in output order
+HEADER_JSON = (
+    ("guid", "link_cls_id", ALWAYS),
+    ("r_link_flags", "r_link_flags", ALWAYS),
+    ("r_file_flags", "r_file_flags", ALWAYS),
+    ("creation_time", "creation_time", TIME),
+    ("accessed_time", "access_time", TIME),
+    ("modified_time", "write_time", TIME),
+    ("file_size", "file_size", ALWAYS),
+    ("icon_index", "icon_index", ALWAYS),
+    ("windowstyle", "window_style", ALWAYS),
+    ("hotkey", "hot_key", ALWAYS),
+    ("r_hotkey", "raw_hot_key", ALWAYS),
+    ("link_flags", "link_flags", ALWAYS),
+    ("file_flags", "file_flags", ALWAYS),
+    ("header_size", "size", ALL_ONLY),
+    ("reserved0", "reserved0", ALL_ONLY),
+    ("reserved1", "reserved1", ALL_ONLY),
+    ("reserved2", "reserved2", ALL_ONLY),
+)
+
+LINK_INFO_JSON = (
+    ("link_info_size", "size", ALL_ONLY),
+    ("link_info_header_size", "header_size", ALL_ONLY),
+    ("link_info_flags", "flags", ALWAYS),
+    ("volume_id_offset", "volume_id_offset", ALL_ONLY),
+    ("local_base_path_offset", "local_base_path_offset", ALL_ONLY),
+    (
+        "common_network_relative_link_offset",
+        "common_network_relative_link_offset",
+        ALL_ONLY,
+    ),
+    ("common_path_suffix_offset", "common_path_suffix_offset", ALL_ONLY),
+)
+
+LOCATION_JSON = {
+    "Local": (
+        ("volume_id_size", "volume_id_size", ALL_ONLY),
+        ("r_drive_type", "r_drive_type", ALWAYS),
+        ("volume_label_offset", "volume_label_offset", ALL_ONLY),
+        ("drive_serial_number", "drive_serial_number", ALWAYS),
+        ("drive_type", "drive_type", ALWAYS),
+        ("volume_label", "volume_label", ALWAYS),
+        (
+            "local_base_path_offset_unicode",
+            "local_base_path_offset_unicode",
+            TRUTHY,
+        ),
+        ("common_path_suffix_unicode", "common_path_suffix_unicode", TRUTHY),
+        ("volume_label_unicode_offset", "volume_label_unicode_offset", TRUTHY),
+        ("volume_label_unicode", "volume_label_unicode", TRUTHY),
+        ("local_base_unicode", "local_base_unicode", TRUTHY),
+    ),
+    "Network": (
+        (
+            "common_network_relative_link_size",
+            "common_network_relative_link_size",
+            ALL_ONLY,
+        ),
+        (
+            "common_network_relative_link_flags",
+            "common_network_relative_link_flags",
+            ALWAYS,
+        ),
+        ("net_name_offset", "net_name_offset", ALL_ONLY),
+        ("device_name_offset", "device_name_offset", ALL_ONLY),
+        ("r_network_provider_type", "r_network_provider_type", ALWAYS),
+        ("network_provider_type", "network_provider_type", TRUTHY),
+        ("net_name_offset_unicode", "net_name_offset_unicode", TRUTHY),
+        ("net_name_unicode", "net_name_unicode", TRUTHY),
+        ("device_name_offset_unicode", "device_name_offset_unicode", TRUTHY),
+        ("net_name", "net_name", TRUTHY),
+        ("device_name", "device_name", TRUTHY),
+    ),
+}
+
+
+def _target_json(targets, index, get_all, fmt=None, select=None):
+    res = {}
+    if get_all if select is None else "size" in select:
+        res["size"] = targets.id_list_size()
+    if _selected(select, "items"):
+        res["items"] = items = targets.as_list()
+        # Only file entry items have a modification time
+        for item in items:
+            if item and "modification_time" in item:
+                if not get_all:
+                    del item["modification_time"]
+                elif fmt is not None:
+                    item["modification_time"] = fmt(item["modification_time"])
+    if get_all if select is None else "index" in select:
+        res["index"] = index
+    return res
+
+
+def _link_info_json(info, get_all, select=None):
+    if not info:
+        return {}
+
+    res = _json_fields(info, LINK_INFO_JSON, get_all, None, select)
+    if _selected(select, "location_info"):
+        res["location_info"] = {}
+
+    location = type(info).__name__
+    if location == "Local":
+        for key in ("local_base_path", "common_path_suffix"):
+            if _selected(select, key):
+                res[key] = getattr(info, key)()
+    if location in LOCATION_JSON:
+        if _selected(select, "location"):
+            res["location"] = info.location()
+        if _selected(select, "location_info"):
+            res["location_info"] = _json_fields(
+                info,
+                LOCATION_JSON[location],
+                get_all,
+                None,
+                _below(select, "location_info"),
+            )
+    return res
 
 
 class LnkFile(object):
-    def __init__(self, fhandle=None, indata=None, cp=None):
-        if fhandle:
-            self.indata = fhandle.read()
+    def __init__(
+        self,
+        fhandle=None,
+        indata=None,
+        cp=None,
+        lazy=False,
+        ctx=None,
+        stream=False,
+        path=None,
+        raw=False,
+        validation=LENIENT,
+        profile=False,
+        mmap=False,
+    ):
+        self._appended_data_size = None
+        if path is not None and mmap and not stream:
+            # The mapping lives as long as this object
+            self.indata = map_file(path)
+        elif path is not None:
+            with open(path, "rb") as fhandle:
+                if stream:
+                    self.indata, self._appended_data_size = read_structure(fhandle)
+                else:
+                    self.indata = fhandle.read()
+        elif fhandle:
+            if stream:
+                # Only the bytes covered by the size fields are read
+                self.indata, self._appended_data_size = read_structure(fhandle)
+            else:
+                self.indata = fhandle.read()
         elif indata:
             self.indata = indata
 
-        self.cp = cp
+        # A context passed in (e.g. in batch mode) is reset and reused, it
+        # keeps its own code page, output mode, validation level and profiling
+        self._shared_ctx = ParseContext.ensure(ctx, cp, raw, validation, profile)
+        self.cp = self._shared_ctx.cp
+        self.lazy = lazy
 
         self.process()
 
     def has_relative_path(self):
-        return bool("HasRelativePath" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.HAS_RELATIVE_PATH)
 
     def has_arguments(self):
-        return bool("HasArguments" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.HAS_ARGUMENTS)
 
     def is_unicode(self):
-        return bool("IsUnicode" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.IS_UNICODE)
 
     def has_name(self):
-        return bool("HasName" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.HAS_NAME)
 
     def has_working_dir(self):
-        return bool("HasWorkingDir" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.HAS_WORKING_DIR)
 
     def has_icon_location(self):
-        return bool("HasIconLocation" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.HAS_ICON_LOCATION)
 
     def has_target_id_list(self):
-        return bool("HasTargetIDList" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.HAS_TARGET_ID_LIST)
 
     def has_link_info(self):
-        return bool("HasLinkInfo" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.HAS_LINK_INFO)
 
     def force_no_link_info(self):
-        return bool("ForceNoLinkInfo" in self.header.link_flags())
+        return bool(self.header.r_link_flags() & LinkFlags.FORCE_NO_LINK_INFO)
 
     def process(self):
+        """
+        Parse the header and locate the other sections. Unless `lazy` is set,
+        the sections are decoded right away; otherwise each of them is decoded
+        on the first access and cached. With profiling, the stages are timed
+        in `metrics`.
+        """
         index = 0
+        self._shared_ctx.reset(self.indata)
+        # The structures report to a context of their own, the shared one may
+        # be reset for another file before the lazy sections are decoded
+        self.ctx = self._shared_ctx.bind()
+        data = self.ctx.data
+
+        self._data = data
+        self._sections = {}
+        self._decoded = {}
+        self.diagnostics = self.ctx.diagnostics
+        self.metrics = metrics = self.ctx.metrics
+        if metrics is not None:
+            metrics.files += 1
 
         # Parse header
-        self.header = LnkHeader(indata=self.indata)
+        with stage(metrics, "header", LnkHeader.STRUCT.size):
+            self.header = LnkHeader(indata=data, ctx=self.ctx)
         index += self.header.size()
 
         # XXX: json
         self._target_index = index + 2
 
-        # Parse ID List
-        self.targets = None
+        # Locate ID List
         if self.has_target_id_list():
-            self.targets = LnkTargets(indata=self.indata[index:], cp=self.cp)
-            index += self.targets.size()
+            self._sections["targets"] = index
+            id_list_size = data[index:].unpack("<H")[0]
+            index += LnkTargets.SIZE_OF_ID_LIST_SIZE + id_list_size
 
-        # Parse Link Info
-        self.info = None
+        # Locate Link Info
         if self.has_link_info() and not self.force_no_link_info():
-            info = LnkInfo(indata=self.indata[index:], cp=self.cp)
-            info_class = InfoFactory(info).info_class()
+            with stage(metrics, "link_info"):
+                info = LnkInfo(indata=data[index:], ctx=self.ctx)
+                info_class = InfoFactory(info).info_class()
             if info_class:
-                self.info = info_class(indata=self.indata[index:], cp=self.cp)
-                index += self.info.size()
+                self._sections["info"] = index
+                self._info_class = info_class
+                index += info.size()
+
+        # Locate String Data (strings themselves are decoded on demand)
+        with stage(metrics, "string_data"):
+            string_data = StringData(self, indata=data[index:], ctx=self.ctx)
+        self._decoded["string_data"] = string_data
+        index += string_data.size()
+
+        # Locate Extra Data
+        self._sections["extras"] = index
+
+        if not self.lazy:
+            for name in ("targets", "info", "extras"):
+                self._section(name)
+
+    def _section(self, name):
+        try:
+            return self._decoded[name]
+        except KeyError:
+            pass
+
+        section = None
+        if name in self._sections:
+            indata = self._data[self._sections[name] :]
+            if name == "targets":
+                with stage(self.metrics, "targets"):
+                    section = LnkTargets(indata=indata, ctx=self.ctx)
+            elif name == "info":
+                with stage(self.metrics, "link_info"):
+                    section = self._info_class(indata=indata, ctx=self.ctx)
+            elif name == "extras":
+                with stage(self.metrics, "extras"):
+                    section = ExtraData(indata=indata, ctx=self.ctx)
+
+        self._decoded[name] = section
+        return section
+
+    def appended_data_size(self):
+        """
+        Number of bytes after the terminal block of ExtraData.
+        """
+        if self._appended_data_size is None:
+            view = self._data.view()
+            size = structure_size(BufferSource(view))
+            self._appended_data_size = max(len(view) - size, 0)
+        return self._appended_data_size
 
-        # Parse String Data
-        self.string_data = StringData(self, indata=self.indata[index:], cp=self.cp)
-        index += self.string_data.size()
+    @property
+    def targets(self):
+        return self._section("targets")
 
-        # Parse Extra Data
-        self.extras = ExtraData(indata=self.indata[index:], cp=self.cp)
+    @property
+    def info(self):
+        return self._section("info")
+
+    @property
+    def string_data(self):
+        return self._section("string_data")
+
+    @property
+    def extras(self):
+        return self._section("extras")
 
     def print_lnk_file(self, print_all=False):
         def cprint(text, level=0):
@@ -130,7 +430,7 @@ class LnkFile(object):
         cprint("Reserved2: %s" % self.header.reserved2(), 1)
         cprint("")
 
-        if self.targets:
+        if self.targets is not None:
             cprint("TARGETS:", 1)
             cprint("Size: %s" % self.targets.id_list_size(), 2)
             cprint("Index: %s" % self._target_index, 2)
@@ -184,14 +484,6 @@ class LnkFile(object):
                         % self.info.common_path_suffix_unicode(),
                         3,
                     )
-                if self.info.volume_id():
-                    cprint("Volume id: %s" % self.info.volume_id(), 3)
-                if self.info.common_network_relative_link():
-                    cprint(
-                        "Common network relative link: %s"
-                        % self.info.common_network_relative_link(),
-                        3,
-                    )
                 if self.info.volume_label_unicode_offset():
                     cprint(
                         "Volume label unicode offset: %s"
@@ -284,219 +576,77 @@ class LnkFile(object):
         else:
             print(out)
 
-    def print_json(self, print_all=False):
-        res = self.get_json(print_all)
-
-        def _datetime_to_str(obj):
-            if isinstance(obj, datetime.datetime):
-                return obj.replace(microsecond=0).isoformat()
-            return obj
+    def print_json(self, print_all=False, fields=None):
+        res = self.get_json(print_all, format_times=True, fields=fields)
 
         print(
             json.dumps(
                 res,
                 indent=4,
                 separators=(",", ": "),
-                default=_datetime_to_str,
+                default=json_default,
                 sort_keys=True,
             )
         )
 
-    def get_json(self, get_all=False):
-        res = {
-            "header": {
-                "guid": self.header.link_cls_id(),
-                "r_link_flags": self.header.r_link_flags(),
-                "r_file_flags": self.header.r_file_flags(),
-                "creation_time": self.header.creation_time(),
-                "accessed_time": self.header.access_time(),
-                "modified_time": self.header.write_time(),
-                "file_size": self.header.file_size(),
-                "icon_index": self.header.icon_index(),
-                "windowstyle": self.header.window_style(),
-                "hotkey": self.header.hot_key(),
-                "r_hotkey": self.header.raw_hot_key(),
-                "link_flags": self.header.link_flags(),
-                "file_flags": self.header.file_flags(),
-                "header_size": self.header.size(),
-                "reserved0": self.header.reserved0(),
-                "reserved1": self.header.reserved1(),
-                "reserved2": self.header.reserved2(),
-            },
-            "data": self.string_data.as_dict(),
-            "extra": self.extras.as_dict(),
-        }
-
-        if self.targets:
-            res["target"] = {
-                "size": self.targets.id_list_size(),
-                "items": self.targets.as_list(),
-                "index": self._target_index,
-            }
-
-        res["link_info"] = {}
-        if self.info:
-            res["link_info"] = {
-                "link_info_size": self.info.size(),
-                "link_info_header_size": self.info.header_size(),
-                "link_info_flags": self.info.flags(),
-                "volume_id_offset": self.info.volume_id_offset(),
-                "local_base_path_offset": self.info.local_base_path_offset(),
-                "common_network_relative_link_offset": self.info.common_network_relative_link_offset(),
-                "common_path_suffix_offset": self.info.common_path_suffix_offset(),
-            }
-
-            res["link_info"]["location_info"] = {}
-            if type(self.info).__name__ == "Local":
-                res["link_info"]["local_base_path"] = self.info.local_base_path()
-                res["link_info"]["common_path_suffix"] = self.info.common_path_suffix()
-                res["link_info"]["location"] = self.info.location()
-
-                res["link_info"]["location_info"] = {
-                    "volume_id_size": self.info.volume_id_size(),
-                    "r_drive_type": self.info.r_drive_type(),
-                    "volume_label_offset": self.info.volume_label_offset(),
-                    "drive_serial_number": self.info.drive_serial_number(),
-                    "drive_type": self.info.drive_type(),
-                    "volume_label": self.info.volume_label(),
-                }
-
-                if self.info.local_base_path_offset_unicode():
-                    res["link_info"]["location_info"][
-                        "local_base_path_offset_unicode"
-                    ] = self.info.local_base_path_offset_unicode()
-                if self.info.common_path_suffix_unicode():
-                    res["link_info"]["location_info"][
-                        "common_path_suffix_unicode"
-                    ] = self.info.common_path_suffix_unicode()
-                if self.info.volume_id():
-                    res["link_info"]["location_info"][
-                        "volume_id"
-                    ] = self.info.volume_id()
-                if self.info.common_network_relative_link():
-                    res["link_info"]["location_info"][
-                        "common_network_relative_link"
-                    ] = self.info.common_network_relative_link()
-                if self.info.volume_label_unicode_offset():
-                    res["link_info"]["location_info"][
-                        "volume_label_unicode_offset"
-                    ] = self.info.volume_label_unicode_offset()
-                if self.info.volume_label_unicode():
-                    res["link_info"]["location_info"][
-                        "volume_label_unicode"
-                    ] = self.info.volume_label_unicode()
-                if self.info.local_base_unicode():
-                    res["link_info"]["location_info"][
-                        "local_base_unicode"
-                    ] = self.info.local_base_unicode()
-            elif type(self.info).__name__ == "Network":
-                res["link_info"]["location"] = self.info.location()
-                res["link_info"]["location_info"] = {
-                    "common_network_relative_link_size": self.info.common_network_relative_link_size(),
-                    "common_network_relative_link_flags": self.info.common_network_relative_link_flags(),
-                    "net_name_offset": self.info.net_name_offset(),
-                    "device_name_offset": self.info.device_name_offset(),
-                    "r_network_provider_type": self.info.r_network_provider_type(),
-                }
-                if self.info.network_provider_type():
-                    res["link_info"]["location_info"][
-                        "network_provider_type"
-                    ] = self.info.network_provider_type()
-                if self.info.net_name_offset_unicode():
-                    res["link_info"]["location_info"][
-                        "net_name_offset_unicode"
-                    ] = self.info.net_name_offset_unicode()
-                if self.info.net_name_unicode():
-                    res["link_info"]["location_info"][
-                        "net_name_unicode"
-                    ] = self.info.net_name_unicode()
-                if self.info.device_name_offset_unicode():
-                    res["link_info"]["location_info"][
-                        "device_name_offset_unicode"
-                    ] = self.info.device_name_offset_unicode()
-                if self.info.net_name():
-                    res["link_info"]["location_info"]["net_name"] = self.info.net_name()
-                if self.info.device_name():
-                    res["link_info"]["location_info"][
-                        "device_name"
-                    ] = self.info.device_name()
-
-        if not get_all:
-            res["header"].pop("header_size", None)
-            res["header"].pop("reserved0", None)
-            res["header"].pop("reserved1", None)
-            res["header"].pop("reserved2", None)
-            res["link_info"].pop("link_info_size", None)
-            res["link_info"].pop("link_info_header_size", None)
-            res["link_info"].pop("volume_id_offset", None)
-            res["link_info"].pop("local_base_path_offset", None)
-            res["link_info"].pop("common_network_relative_link_offset", None)
-            res["link_info"].pop("common_path_suffix_offset", None)
-            if (
-                "location" in res["link_info"]
-                and "Local" in res["link_info"]["location"]
-            ):
-                res["link_info"]["location_info"].pop("volume_id_size", None)
-                res["link_info"]["location_info"].pop("volume_label_offset", None)
-            if (
-                "location" in res["link_info"]
-                and "Network" in res["link_info"]["location"]
-            ):
-                res["link_info"]["location_info"].pop(
-                    "common_network_relative_link_size", None
-                )
-                res["link_info"]["location_info"].pop("net_name_offset", None)
-                res["link_info"]["location_info"].pop("device_name_offset", None)
+    def get_json(self, get_all=False, format_times=False, fields=None):
+        """
+        Extracted data as a dict. Only the fields in scope are read (see
+        `HEADER_JSON` etc.), each accessor once. With `format_times`, datetimes
+        are ISO 8601 strings as printed by `print_json`.
+
+        `fields` is a list of dotted paths (e.g. "header.creation_time" or
+        "extra.DISTRIBUTED_LINK_TRACKER_BLOCK") to return instead of
+        everything; they are returned even if `get_all` is not set. Sections
+        which are not selected are not accessed, so with `lazy` they are not
+        decoded at all.
+        """
+        fmt = datetime_to_str if format_times else None
+        select = None if fields is None else select_fields(fields)
+
+        res = {}
+        if _selected(select, "header"):
+            res["header"] = _json_fields(
+                self.header, HEADER_JSON, get_all, fmt, _below(select, "header")
+            )
+        if _selected(select, "data"):
+            res["data"] = self.string_data.as_dict(_below(select, "data"))
+        if _selected(select, "extra"):
+            res["extra"] = self.extras.as_dict(_below(select, "extra"))
+
+        if _selected(select, "target") and self.targets is not None:
+            res["target"] = _target_json(
+                self.targets,
+                self._target_index,
+                get_all,
+                fmt,
+                _below(select, "target"),
+            )
 
-            if "target" in res:
-                res["target"].pop("index", None)
-                res["target"].pop("size", None)
-                if "items" in res["target"]:
-                    for item in res["target"]["items"]:
-                        if item:
-                            item.pop("modification_time", None)
+        if _selected(select, "link_info"):
+            res["link_info"] = _link_info_json(
+                self.info, get_all, _below(select, "link_info")
+            )
 
         return res
 
+    def get_record(self):
+        """
+        Compact `LnkRecord` of the data, for keeping many results in memory
+        (see `LnkParse3.records`). Its `to_dict` gives the dict of `get_json`.
+        """
+        # LnkParse3.records depends on this module
+        from LnkParse3.records import LnkRecord
 
-def main():
-    arg_parser = argparse.ArgumentParser(description=__description__)
-    arg_parser.add_argument(
-        dest="file",
-        metavar="FILE",
-        help="absolute or relative path to the file",
-    )
-    arg_parser.add_argument(
-        "-t", "--target", action="store_true", help="print shortcut target only"
-    )
-    arg_parser.add_argument(
-        "-j", "--json", action="store_true", help="print output in JSON"
-    )
-    arg_parser.add_argument(
-        "-c",
-        "--codepage",
-        dest="cp",
-        default="cp1252",
-        help="set codepage of ASCII strings",
-    )
-    arg_parser.add_argument(
-        "-a",
-        "--all",
-        dest="print_all",
-        action="store_true",
-        help="print all extracted data (i.e. offsets and sizes)",
-    )
-    args = arg_parser.parse_args()
-
-    with open(args.file, "rb") as file:
-        lnk = LnkFile(fhandle=file, cp=args.cp)
-        if args.target:
-            lnk.print_shortcut_target(pjson=args.json)
-        elif args.json:
-            lnk.print_json(args.print_all)
-        else:
-            lnk.print_lnk_file(args.print_all)
+        return LnkRecord.from_lnk(self)
+
+
+def main(argv=None):
+    # The command line tool lives in LnkParse3.cli, which depends on this module
+    from LnkParse3.cli import main as cli_main
+
+    return cli_main(argv)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
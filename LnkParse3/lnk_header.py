@@ -1,7 +1,14 @@
-from struct import unpack
+from struct import Struct
+from LnkParse3.cursor import Cursor
 from LnkParse3.decorators import must_be
+from LnkParse3.decorators import format_uuid
+from LnkParse3.decorators import raw_mode
 from LnkParse3.decorators import uuid
 from LnkParse3.decorators import filetime
+from LnkParse3.flags import LinkFlags
+from LnkParse3.flags import FileAttributes
+from LnkParse3.diagnostics import OFF
+from LnkParse3.parse_context import ParseContext
 
 """
 SHELL_LINK_HEADER:
@@ -45,7 +52,44 @@ structures.
 """
 
 
+class LnkHeaderFields:
+    """
+    Decoded ShellLinkHeader. Filled by a single `unpack_from` call.
+    """
+
+    __slots__ = (
+        "header_size",
+        "link_cls_id",
+        "link_flags",
+        "file_attributes",
+        "creation_time",
+        "access_time",
+        "write_time",
+        "file_size",
+        "icon_index",
+        "show_command",
+        "hot_key",
+        "reserved1",
+        "reserved2",
+        "reserved3",
+    )
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+
 class LnkHeader:
+    # FILETIME fields are kept as raw bytes for the `filetime` decorator.
+    STRUCT = Struct("<I16sII8s8s8sIiiHHII")
+
+    LINK_CLSID = b"\x01\x14\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00\x00\x00\x00\x46"
+    LINK_CLSID_STR = "00021401-0000-0000-C000-000000000046"
+
+    # HeaderSize + LinkCLSID
+    MAGIC = b"\x4c\x00\x00\x00" + LINK_CLSID
+    MAGIC_SIZE = len(MAGIC)
+
     # https://docs.microsoft.com/en-us/windows/win32/api/winuser/nf-winuser-showwindow
     WINDOW_STYLES = {
         1: "SW_SHOWNORMAL",
@@ -126,192 +170,52 @@ class LnkHeader:
         b"\x91": "SCROLL_LOCK",
     }
 
-    LINK_FLAG_MASK = {  # {{{
-        # LinkTargetIDList structure (section 2.2) MUST follow the
-        # ShellLinkHeader. If this bit is not set, this structure MUST NOT
-        # be present.
-        0x00000001: "HasTargetIDList",
-        # The shell link is saved with link information. If this bit is set,
-        # a LinkInfo structure (section 2.3) MUST be present. If this bit
-        # is not set, this structure MUST NOT be present.
-        0x00000002: "HasLinkInfo",
-        # The shell link is saved with a name string. If this bit is set,
-        # a NAME_STRING StringData structure (section 2.4) MUST be present.
-        # If this bit is not set, this structure MUST NOT be present.
-        0x00000004: "HasName",
-        # The shell link is saved with a relative path string. If this bit
-        # is set, a RELATIVE_PATH StringData structure (section 2.4) MUST
-        # be present. If this bit is not set, this structure MUST NOT be
-        # present.
-        0x00000008: "HasRelativePath",
-        # The shell link is saved with a working directory string. If this
-        # bit is set, a WORKING_DIR StringData structure (section 2.4) MUST
-        # be present. If this bit is not set, this structure MUST NOT be
-        # present.
-        0x00000010: "HasWorkingDir",
-        # The shell link is saved with command line arguments. If this bit
-        # is set, a COMMAND_LINE_ARGUMENTS StringData structure (section
-        # 2.4) MUST be present. If this bit is not set, this structure MUST
-        # NOT be present.
-        0x00000020: "HasArguments",
-        # The shell link is saved with an icon location string. If this bit
-        # is set, an ICON_LOCATION StringData structure (section 2.4) MUST
-        # be present. If this bit is not set, this structure MUST NOT be
-        # present.
-        0x00000040: "HasIconLocation",
-        # The shell link contains Unicode encoded strings. This bit SHOULD
-        # be set. If this bit is set, the StringData section contains
-        # Unicode-encoded strings; otherwise, it contains strings that are
-        # encoded using the system default code page.
-        0x00000080: "IsUnicode",
-        # The LinkInfo structure (section 2.3) is ignored.
-        0x00000100: "ForceNoLinkInfo",
-        # The shell link is saved with an EnvironmentVariableDataBlock
-        # (section 2.5.4).
-        0x00000200: "HasExpString",
-        # The target is run in a separate virtual machine when launching
-        # a link target that is a 16-bit application.
-        0x00000400: "RunInSeparateProcess",
-        # TODO: Unused1
-        # A bit that is undefined and MUST be ignored.
-        0x00000800: "Reserved0",
-        # The shell link is saved with a DarwinDataBlock (section 2.5.3).
-        0x00001000: "HasDarwinID",
-        # The application is run as a different user when the target of the
-        # shell link is activated.
-        0x00002000: "RunAsUser",
-        # The shell link is saved with an IconEnvironmentDataBlock (section
-        # 2.5.5).
-        0x00004000: "HasExpIcon",
-        # The file system location is represented in the shell namespace
-        # when the path to an item is parsed into an IDList.
-        0x00008000: "NoPidlAlias",
-        # TODO: Unused2
-        # A bit that is undefined and MUST be ignored.
-        0x00010000: "Reserved1",
-        # The shell link is saved with a ShimDataBlock (section 2.5.8).
-        0x00020000: "RunWithShimLayer",
-        # The TrackerDataBlock (section 2.5.10) is ignored.
-        0x00040000: "ForceNoLinkTrack",
-        # The shell link attempts to collect target properties and store
-        # them in the PropertyStoreDataBlock (section 2.5.7) when the link
-        # target is set.
-        0x00080000: "EnableTargetMetadata",
-        # The EnvironmentVariableDataBlock is ignored.
-        0x00100000: "DisableLinkPathTracking",
-        # The SpecialFolderDataBlock (section 2.5.9) and the
-        # KnownFolderDataBlock (section 2.5.6) are ignored when loading the
-        # shell link. If this bit is set, these extra data blocks SHOULD
-        # NOT be saved when saving the shell link.
-        0x00200000: "DisableKnownFolderTracking",
-        # If the link has a KnownFolderDataBlock (section 2.5.6), the
-        # unaliased form of the known folder IDList SHOULD be used when
-        # translating the target IDList at the time that the link is
-        # loaded.
-        0x00400000: "DisableKnownFolderAlias",
-        # Creating a link that references another link is enabled.
-        # Otherwise, specifying a link as the target IDList SHOULD NOT be
-        # allowed.
-        0x00800000: "AllowLinkToLink",
-        # When saving a link for which the target IDList is under a known
-        # folder, either the unaliased form of that known folder or the
-        # target IDList SHOULD be used.
-        0x01000000: "UnaliasOnSave",
-        # The target IDList SHOULD NOT be stored; instead, the path
-        # specified in the 2.1.2 FileAttributesFlags
-        # EnvironmentVariableDataBlock (section 2.5.4) SHOULD be used to
-        # refer to the target.
-        0x02000000: "PreferEnvironmentPath",
-        # When the target is a UNC name that refers to a location on
-        # a local machine, the local path IDList in the
-        # PropertyStoreDataBlock (section 2.5.7) SHOULD be stored, so it
-        # can be used when the link is loaded on the local machine.
-        0x04000000: "KeepLocalIDListForUNCTarget",
-    }  # }}}
-
-    FILE_FLAG_MASK = {  # {{{
-        # The file or directory is read-only. For a file, if this bit is set,
-        # applications can read the file but cannot write to it or delete it.
-        # For a directory, if this bit is set, applications cannot delete the
-        # directory.
-        0x00000001: "FILE_ATTRIBUTE_READONLY",
-        # The file or directory is hidden. If this bit is set, the file or
-        # folder is not included in an ordinary directory listing.
-        0x00000002: "FILE_ATTRIBUTE_HIDDEN",
-        # The file or directory is part of the operating system or is used
-        # exclusively by the operating system.
-        0x00000004: "FILE_ATTRIBUTE_SYSTEM",
-        # TODO: Reserved1
-        # A bit that MUST be zero.
-        0x00000008: "Reserved, not used by the LNK format",
-        # The link target is a directory instead of a file.
-        0x00000010: "FILE_ATTRIBUTE_DIRECTORY",
-        # The file or directory is an archive file. Applications use this flag
-        # to mark files for backup or removal.
-        0x00000020: "FILE_ATTRIBUTE_ARCHIVE",
-        # A bit that MUST be zero.
-        0x00000040: "FILE_ATTRIBUTE_DEVICE",
-        # The file or directory has no other flags set. If this bit is 1, all
-        # other bits in this structure MUST be clear.
-        0x00000080: "FILE_ATTRIBUTE_NORMAL",
-        # The file is being used for temporary storage.
-        0x00000100: "FILE_ATTRIBUTE_TEMPORARY",
-        # The file is a sparse file.
-        0x00000200: "FILE_ATTRIBUTE_SPARSE_FILE",
-        # The file or directory has an associated reparse point.
-        0x00000400: "FILE_ATTRIBUTE_REPARSE_POINT",
-        # The file or directory is compressed. For a file, this means that all
-        # data in the file is compressed. For a directory, this means that
-        # compression is the default for newly created files and
-        # subdirectories.
-        0x00000800: "FILE_ATTRIBUTE_COMPRESSED",
-        # The data of the file is not immediately available.
-        0x00001000: "FILE_ATTRIBUTE_OFFLINE",
-        # The contents of the file need to be indexed.
-        0x00002000: "FILE_ATTRIBUTE_NOT_CONTENT_INDEXED",
-        # The file or directory is encrypted. For a file, this means that all
-        # data in the file is encrypted. For a directory, this means that
-        # encryption is the default for newly created files and subdirectories.
-        0x00004000: "FILE_ATTRIBUTE_ENCRYPTED",
-        # The directory or user data stream is configured with integrity
-        # (only supported on ReFS volumes).
-        0x00008000: "FILE_ATTRIBUTE_INTEGRITY_STREAM",
-        # Is virtual
-        0x00010000: "FILE_ATTRIBUTE_VIRTUAL",
-        # The user data stream not to be read by the background data
-        # integrity scanner (AKA scrubber).
-        0x00020000: "FILE_ATTRIBUTE_NO_SCRUB_DATA",
-    }  # }}}
-
-    def __init__(self, fhandle=None, indata=None):
+    LINK_FLAG_MASK = LinkFlags.MASK
+
+    FILE_FLAG_MASK = FileAttributes.MASK
+
+    def __init__(self, fhandle=None, indata=None, ctx=None):
+        self.ctx = ParseContext.ensure(ctx)
         if fhandle:
-            self._raw = fhandle.read()
+            self._raw = fhandle.read(self.STRUCT.size)
         elif indata:
             self._raw = indata
 
-        self._lnk_header = {}
-        self._stash = {}
+        self._raw = Cursor.wrap(self._raw)[: self.STRUCT.size]
+        self._fields = LnkHeaderFields(self._raw.unpack(self.STRUCT))
+        self._fields.link_flags = LinkFlags(self._fields.link_flags)
+        self._fields.file_attributes = FileAttributes(self._fields.file_attributes)
 
-        self._raw = self._raw[: self.size()]
+    @classmethod
+    def is_lnk_magic(cls, binary):
+        """
+        Check HeaderSize and LinkCLSID at the start of `binary`.
+        """
+        return bytes(binary[: cls.MAGIC_SIZE]) == cls.MAGIC
 
-    @must_be(int("0x0000004C", 16))
+    @must_be(int("0x0000004C", 16), offset=0)
     def size(self):
         """HeaderSize (4 bytes):
         The size, in bytes, of this structure.
         This value MUST be 0x0000004C.
         """
-        start, end = 0, 4
-        size = unpack("<I", self._raw[start:end])[0]
-        return size
+        return self._fields.header_size
 
-    @must_be("00021401-0000-0000-C000-000000000046")
-    @uuid
     def link_cls_id(self):
         """LinkCLSID (16 bytes):
         A class identifier (CLSID).
         This value MUST be 00021401-0000-0000-C000-000000000046.
         """
-        return self._raw[4:20]
+        value = self._link_cls_id()
+        ctx = self.ctx
+        if ctx.validation != OFF and self._fields.link_cls_id != self.LINK_CLSID:
+            text = format_uuid(self._fields.link_cls_id)
+            ctx.invalid("link_cls_id", self.LINK_CLSID_STR, text, 4)
+        return value
+
+    @uuid
+    def _link_cls_id(self):
+        return self._fields.link_cls_id
 
     def guid(self):
         return self.link_cls_id()
@@ -321,9 +225,7 @@ class LnkHeader:
         A LinkFlags structure (section 2.1.1) that specifies information about
         the shell link and the presence of optional portions of the structure.
         """
-        start, end = 20, 24
-        flags = unpack("<I", self._raw[start:end])[0]
-        return flags
+        return self._fields.link_flags
 
     def link_flags(self):
         """
@@ -331,18 +233,14 @@ class LnkHeader:
         structures are present in the file format after the ShellLinkHeader
         structure (section 2.1).
         """
-        items = sorted(self.LINK_FLAG_MASK.items())
-        flag = self.r_link_flags()
-        return [key for mask, key in items if bool(flag & mask)]
+        return self._fields.link_flags.names()
 
     def r_file_flags(self):
         """FileAttributes (4 bytes):
         A FileAttributesFlags structure (section 2.1.2) that specifies
         information about the link target.
         """
-        start, end = 24, 28
-        flags = unpack("<I", self._raw[start:end])[0]
-        return flags
+        return self._fields.file_attributes
 
     def file_flags(self):
         """
@@ -352,39 +250,34 @@ class LnkHeader:
         accessing the target would be inefficient. It is possible for the
         target items attributes to be out of sync with this value.
         """
-        items = sorted(self.FILE_FLAG_MASK.items())
-        flag = self.r_file_flags()
-        return [key for mask, key in items if bool(flag & mask)]
+        return self._fields.file_attributes.names()
 
-    @filetime
+    @filetime(offset=28)
     def creation_time(self):
         """CreationTime (8 bytes):
         A FILETIME structure ([MS-DTYP] section 2.3.3) that specifies the
         creation time of the link target in UTC (Coordinated Universal Time).
         If the value is zero, there is no creation time set on the link target.
         """
-        start, end = 28, 36
-        return self._raw[start:end]
+        return self._fields.creation_time
 
-    @filetime
+    @filetime(offset=36)
     def access_time(self):
         """AccessTime (8 bytes):
         A FILETIME structure ([MS-DTYP] section 2.3.3) that specifies the
         access time of the link target in UTC (Coordinated Universal Time). If
         the value is zero, there is no access time set on the link target.
         """
-        start, end = 36, 44
-        return self._raw[start:end]
+        return self._fields.access_time
 
-    @filetime
+    @filetime(offset=44)
     def write_time(self):
         """WriteTime (8 bytes):
         A FILETIME structure ([MS-DTYP] section 2.3.3) that specifies the write
         time of the link target in UTC (Coordinated Universal Time). If the
         value is zero, there is no write time set on the link target.
         """
-        start, end = 44, 52
-        return self._raw[start:end]
+        return self._fields.write_time
 
     def file_size(self):
         """FileSize (4 bytes):
@@ -393,18 +286,14 @@ class LnkHeader:
         value specifies the least significant 32 bits of the link target file
         size.
         """
-        start, end = 52, 56
-        size = unpack("<I", self._raw[start:end])[0]
-        return size
+        return self._fields.file_size
 
     def icon_index(self):
         """IconIndex (4 bytes):
         A 32-bit signed integer that specifies the index of an icon within
         a given icon location.
         """
-        start, end = 56, 60
-        index = unpack("<i", self._raw[start:end])[0]
-        return index
+        return self._fields.icon_index
 
     # TODO: rename to show_command
     def window_style(self):
@@ -426,16 +315,17 @@ class LnkHeader:
 
         All other values MUST be treated as SW_SHOWNORMAL.
         """
-        start, end = 60, 64
-        style = unpack("<i", self._raw[start:end])[0]
+        style = self._fields.show_command
         fallback = self.WINDOW_STYLES[1]
         return self.WINDOW_STYLES.get(style, fallback)
 
     # TODO: See _raw_hot_key
     def hot_key(self):
-        start, end = 64, 66
-        hot_key = self._raw[start:end]
-        b_low, b_high = unpack("<cc", hot_key)
+        if raw_mode(self):
+            return self._fields.hot_key
+
+        hot_key = self._fields.hot_key.to_bytes(2, "little")
+        b_low, b_high = hot_key[0:1], hot_key[1:2]
 
         high = self.HOTKEY_VALUES_HIGH.get(b_high)
         low = self.HOTKEY_VALUES_LOW.get(b_low)
@@ -452,38 +342,50 @@ class LnkHeader:
         value is assigned to the application after it is launched, so that
         pressing the key activates that application.
         """
-        start, end = 64, 66
-        raw = unpack("<H", self._raw[start:end])[0]
-        return raw
+        return self._fields.hot_key
 
     # TODO: rename to reserved1
-    @must_be(0)
+    @must_be(0, offset=66)
     def reserved0(self):
         """Reserved1 (2 bytes):
         A value that MUST be zero.
         """
-        start, end = 66, 68
-        raw = unpack("<H", self._raw[start:end])[0]
-        return raw
+        return self._fields.reserved1
 
     # TODO: rename to reserved2
-    @must_be(0)
+    @must_be(0, offset=68)
     def reserved1(self):
         """Reserved2 (4 bytes):
         A value that MUST be zero.
         """
-        start, end = 68, 72
-        raw = unpack("<I", self._raw[start:end])[0]
-
-        return raw
+        return self._fields.reserved2
 
     # TODO: rename to reserved3
-    @must_be(0)
+    @must_be(0, offset=72)
     def reserved2(self):
         """Reserved3 (4 bytes):
         A value that MUST be zero.
         """
-        start, end = 72, 76
-        raw = unpack("<I", self._raw[start:end])[0]
+        return self._fields.reserved3
+
+
+def peek_header(path_or_fh):
+    """
+    Read and decode only the ShellLinkHeader of a file (a path or a binary
+    file object). The file is rejected after its first 20 bytes (HeaderSize
+    and LinkCLSID) if it is not a shell link. Returns a `LnkHeader` or
+    `None` for files which are not shell links.
+    """
+    if not hasattr(path_or_fh, "read"):
+        with open(path_or_fh, "rb") as fhandle:
+            return peek_header(fhandle)
+
+    magic = path_or_fh.read(LnkHeader.MAGIC_SIZE)
+    if len(magic) < LnkHeader.MAGIC_SIZE or not LnkHeader.is_lnk_magic(magic):
+        return None
+
+    rest = path_or_fh.read(LnkHeader.STRUCT.size - LnkHeader.MAGIC_SIZE)
+    if len(rest) < LnkHeader.STRUCT.size - LnkHeader.MAGIC_SIZE:
+        return None
 
-        return raw
+    return LnkHeader(indata=magic + rest)
@@ -1,5 +1,10 @@
-from struct import unpack
-from LnkParse3.text_processor import TextProcessor
+from struct import Struct
+from struct import error as StructError
+
+from LnkParse3.cursor import Cursor
+from LnkParse3.decorators import formatted
+from LnkParse3.metrics import timed
+from LnkParse3.parse_context import ParseContext
 
 """
 LINKINFO:
@@ -50,10 +55,153 @@ ShellLinkHeader.
 """
 
 
+class CommonNetworkRelativeLink:
+    """
+    Decoded CommonNetworkRelativeLink structure (section 2.3.2), with all of
+    its strings. Absent fields are None.
+    """
+
+    __slots__ = (
+        "size",
+        "flags",
+        "net_name_offset",
+        "device_name_offset",
+        "network_provider_type",
+        "net_name_offset_unicode",
+        "device_name_offset_unicode",
+        "net_name",
+        "device_name",
+        "net_name_unicode",
+        "device_name_unicode",
+    )
+
+    STRUCT = Struct("<5I")
+    UNICODE_OFFSETS = Struct("<II")
+
+    def __init__(self, raw, text_processor):
+        (
+            self.size,
+            self.flags,
+            self.net_name_offset,
+            self.device_name_offset,
+            self.network_provider_type,
+        ) = raw.unpack(self.STRUCT)
+
+        self.net_name_offset_unicode = None
+        self.device_name_offset_unicode = None
+        self.net_name = None
+        self.device_name = None
+        self.net_name_unicode = None
+        self.device_name_unicode = None
+
+        # ValidDevice: the device name offsets are valid
+        valid_device = self.flags & 0x0001
+
+        # Offsets to the Unicode names are present if NetNameOffset > 0x14
+        if self.net_name_offset > 0x14:
+            (
+                self.net_name_offset_unicode,
+                self.device_name_offset_unicode,
+            ) = raw.unpack(self.UNICODE_OFFSETS, 20)
+            self.net_name_unicode = text_processor.read_unicode_string(
+                raw[self.net_name_offset_unicode :]
+            )
+            if valid_device:
+                self.device_name_unicode = text_processor.read_unicode_string(
+                    raw[self.device_name_offset_unicode :]
+                )
+        else:
+            self.net_name = text_processor.read_string(raw[self.net_name_offset :])
+            if valid_device:
+                self.device_name = text_processor.read_string(
+                    raw[self.device_name_offset :]
+                )
+
+
 class LnkInfo:
-    def __init__(self, indata=None, cp=None):
-        self._raw = indata
-        self.text_processor = TextProcessor(cp=cp)
+    # LinkInfoSize ... CommonPathSuffixOffset
+    HEADER = Struct("<7I")
+
+    NETWORK_PROVIDER_TYPES = {
+        "0x1A000": "WNNC_NET_AVID",
+        "0x1B000": "WNNC_NET_DOCUSPACE",
+        "0x1C000": "WNNC_NET_MANGOSOFT",
+        "0x1D000": "WNNC_NET_SERNET",
+        "0X1E000": "WNNC_NET_RIVERFRONT1",
+        "0x1F000": "WNNC_NET_RIVERFRONT2",
+        "0x20000": "WNNC_NET_DECORB",
+        "0x21000": "WNNC_NET_PROTSTOR",
+        "0x22000": "WNNC_NET_FJ_REDIR",
+        "0x23000": "WNNC_NET_DISTINCT",
+        "0x24000": "WNNC_NET_TWINS",
+        "0x25000": "WNNC_NET_RDR2SAMPLE",
+        "0x26000": "WNNC_NET_CSC",
+        "0x27000": "WNNC_NET_3IN1",
+        "0x29000": "WNNC_NET_EXTENDNET",
+        "0x2A000": "WNNC_NET_STAC",
+        "0x2B000": "WNNC_NET_FOXBAT",
+        "0x2C000": "WNNC_NET_YAHOO",
+        "0x2D000": "WNNC_NET_EXIFS",
+        "0x2E000": "WNNC_NET_DAV",
+        "0x2F000": "WNNC_NET_KNOWARE",
+        "0x30000": "WNNC_NET_OBJECT_DIRE",
+        "0x31000": "WNNC_NET_MASFAX",
+        "0x32000": "WNNC_NET_HOB_NFS",
+        "0x33000": "WNNC_NET_SHIVA",
+        "0x34000": "WNNC_NET_IBMAL",
+        "0x35000": "WNNC_NET_LOCK",
+        "0x36000": "WNNC_NET_TERMSRV",
+        "0x37000": "WNNC_NET_SRT",
+        "0x38000": "WNNC_NET_QUINCY",
+        "0x39000": "WNNC_NET_OPENAFS",
+        "0X3A000": "WNNC_NET_AVID1",
+        "0x3B000": "WNNC_NET_DFS",
+        "0x3C000": "WNNC_NET_KWNP",
+        "0x3D000": "WNNC_NET_ZENWORKS",
+        "0x3E000": "WNNC_NET_DRIVEONWEB",
+        "0x3F000": "WNNC_NET_VMWARE",
+        "0x40000": "WNNC_NET_RSFX",
+        "0x41000": "WNNC_NET_MFILES",
+        "0x42000": "WNNC_NET_MS_NFS",
+        "0x43000": "WNNC_NET_GOOGLE",
+    }
+
+    def __init__(self, indata=None, cp=None, ctx=None):
+        self._raw = Cursor.wrap(indata)
+        self.ctx = ParseContext.ensure(ctx, cp)
+        self.text_processor = self.ctx.text_processor
+        self._header = None
+        self._network = None
+
+    def _field(self, position):
+        """
+        Field of the LinkInfo header. The whole header is unpacked on the
+        first access, a truncated one field by field.
+        """
+        header = self._header
+        if header is None:
+            try:
+                header = self._header = self._decode_header()
+            except StructError:
+                return self._raw.unpack("<I", position * 4)[0]
+        return header[position]
+
+    @timed("link_info", lambda self: self.HEADER.size)
+    def _decode_header(self):
+        return self._raw.unpack(self.HEADER)
+
+    def _common_network_relative_link(self):
+        """
+        CommonNetworkRelativeLink, decoded on the first access.
+        """
+        if self._network is None:
+            self._network = self._decode_network()
+        return self._network
+
+    @timed("link_info")
+    def _decode_network(self):
+        start = self.common_network_relative_link_offset()
+        return CommonNetworkRelativeLink(self._raw[start:], self.text_processor)
 
     def size(self):
         """LinkInfoSize (4 bytes):
@@ -62,8 +210,7 @@ class LnkInfo:
         less than this value, and all strings contained in this structure MUST
         fit within the extent defined by this size.
         """
-        start, end = 0, 4
-        return unpack("<I", self._raw[start:end])[0]
+        return self._field(0)
 
     def header_size(self):
         """LinkInfoHeaderSize (4 bytes):
@@ -80,8 +227,7 @@ class LnkInfo:
         * 0x00000024 ≤ value
             Offsets to the optional fields are specified.
         """
-        start, end = 4, 8
-        return unpack("<I", self._raw[start:end])[0]
+        return self._field(1)
 
     def flags(self):
         """LinkInfoFlags (4 bytes):
@@ -89,8 +235,7 @@ class LnkInfo:
         LocalBasePathUnicode, and CommonNetworkRelativeLink fields are present
         in this structure.
         """
-        start, end = 8, 12
-        return unpack("<I", self._raw[start:end])[0]
+        return self._field(2)
 
     def volume_id_offset(self):
         """VolumeIDOffset (4 bytes):
@@ -99,8 +244,7 @@ class LnkInfo:
         offset, in bytes, from the start of the LinkInfo structure; otherwise,
         this value MUST be zero.
         """
-        start, end = 12, 16
-        return unpack("<I", self._raw[start:end])[0]
+        return self._field(3)
 
     def local_base_path_offset(self):
         """LocalBasePathOffset (4 bytes):
@@ -109,8 +253,7 @@ class LnkInfo:
         value is an offset, in bytes, from the start of the LinkInfo structure;
         otherwise, this value MUST be zero.
         """
-        start, end = 16, 20
-        return unpack("<I", self._raw[start:end])[0]
+        return self._field(4)
 
     def common_network_relative_link_offset(self):
         """CommonNetworkRelativeLinkOffset (4 bytes):
@@ -120,8 +263,7 @@ class LnkInfo:
         offset, in bytes, from the start of the LinkInfo structure; otherwise,
         this value MUST be zero.
         """
-        start, end = 20, 24
-        return unpack("<I", self._raw[start:end])[0]
+        return self._field(5)
 
     def common_path_suffix_offset(self):
         """CommonPathSuffixOffset (4 bytes):
@@ -129,5 +271,47 @@ class LnkInfo:
         CommonPathSuffix field. This value is an offset, in bytes, from the
         start of the LinkInfo structure.
         """
-        start, end = 24, 28
-        return unpack("<I", self._raw[start:end])[0]
+        return self._field(6)
+
+    # Fields of CommonNetworkRelativeLink, of Network and of Local with
+    # the CommonNetworkRelativeLinkAndPathSuffix flag
+    def common_network_relative_link_size(self):
+        return self._common_network_relative_link().size
+
+    def common_network_relative_link_flags(self):
+        return self._common_network_relative_link().flags
+
+    def net_name_offset(self):
+        return self._common_network_relative_link().net_name_offset
+
+    def device_name_offset(self):
+        return self._common_network_relative_link().device_name_offset
+
+    @formatted(hex)
+    def r_network_provider_type(self):
+        return self._common_network_relative_link().network_provider_type
+
+    def network_provider_type(self):
+        # ValidNetType: NetworkProviderType contains a provider type
+        if not self.common_network_relative_link_flags() & 0x0002:
+            return None
+        provider_type = hex(self._common_network_relative_link().network_provider_type)
+        return self.NETWORK_PROVIDER_TYPES.get(provider_type)
+
+    def net_name_offset_unicode(self):
+        return self._common_network_relative_link().net_name_offset_unicode
+
+    def net_name_unicode(self):
+        return self._common_network_relative_link().net_name_unicode
+
+    def device_name_offset_unicode(self):
+        return self._common_network_relative_link().device_name_offset_unicode
+
+    def device_name_unicode(self):
+        return self._common_network_relative_link().device_name_unicode
+
+    def net_name(self):
+        return self._common_network_relative_link().net_name
+
+    def device_name(self):
+        return self._common_network_relative_link().device_name
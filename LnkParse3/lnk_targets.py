@@ -1,4 +1,10 @@
-from struct import unpack
+from array import array
+from struct import error as StructError
+
+from LnkParse3.cursor import Cursor
+from LnkParse3.diagnostics import TARGET_ERROR
+from LnkParse3.metrics import timed
+from LnkParse3.parse_context import ParseContext
 from LnkParse3.target_factory import TargetFactory
 
 """
@@ -15,23 +21,50 @@ HasLinkTargetIDList bit (LinkFlags section 2.1.1) in the ShellLinkHeader.
 |                             ...                                |
 ------------------------------------------------------------------
 """
-import warnings
 
 
 class LnkTargets:
     SIZE_OF_ID_LIST_SIZE = 2
 
-    def __init__(self, indata=None, cp=None):
+    def __init__(self, indata=None, cp=None, ctx=None):
         self._targets = {}
-        self.cp = cp
-        self._raw = indata
+        self.ctx = ParseContext.ensure(ctx, cp)
+        self._raw = Cursor.wrap(indata)
 
         start = self.SIZE_OF_ID_LIST_SIZE
         end = self.size()
         self._raw_targets = self._raw[start:end]
 
+        # Offset table, built on first access
+        self._offsets = None
+        self._types = None
+        self._error = None
+        self._items = {}
+
     def __iter__(self):
-        return self._id_lists()
+        for position in range(len(self._index())):
+            yield self[position]
+
+    def __len__(self):
+        return len(self._index())
+
+    def __getitem__(self, position):
+        offsets = self._index()
+        if position < 0:
+            position += len(offsets)
+        if not 0 <= position < len(offsets):
+            raise IndexError("target index out of range")
+
+        try:
+            return self._items[position]
+        except KeyError:
+            pass
+
+        target_class = TargetFactory.class_for(self._types[position])
+        indata = self._raw_targets[offsets[position] :]
+        target = target_class(indata=indata, ctx=self.ctx)
+        self._items[position] = target
+        return target
 
     def size(self):
         """
@@ -43,11 +76,11 @@ class LnkTargets:
         """IDListSize (2 bytes):
         The size, in bytes, of the IDList field.
         """
-        start, end = 0, self.SIZE_OF_ID_LIST_SIZE
-        size = unpack("<H", self._raw[start:end])[0]
+        start = 0
+        size = self._raw.unpack("<H", start)[0]
         return size
 
-    def _id_lists(self):
+    def _index(self):
         """ItemIDList (variable):
         An array of zero or more ItemID structures (section 2.2.2), which
         contains the item ID list. An IDList structure conforms to the
@@ -64,20 +97,40 @@ class LnkTargets:
         |-----------------------------------------------------------------
         |         TerminalID           |
         --------------------------------
+
+        Offsets (relative to the IDList) and types of the items, found in one
+        pass; the items themselves are created on first access. An unknown or
+        truncated item fails the whole list, for `len`, indexing and
+        iteration alike.
         """
+        if self._offsets is None:
+            self._build_index()
+        if self._error is not None:
+            raise self._error
+        return self._offsets
+
+    @timed("targets", lambda self: self.size())
+    def _build_index(self):
+        offsets = array("I")
+        types = array("B")
         rest = self._raw_targets
-        while rest:
-            factory = TargetFactory(indata=rest)
-            target_class = factory.target_class()
+        try:
+            while rest:
+                factory = TargetFactory(indata=rest)
+                if not factory.target_class():
+                    break
 
-            if not target_class:
-                break
+                offsets.append(rest.start - self._raw_targets.start)
+                types.append(factory.item_type())
 
-            target = target_class(indata=rest, cp=self.cp)
+                size = factory.item_size()
+                rest = rest[size:]  # Narrows the window, no copy
+        except (KeyError, StructError) as e:
+            # Unknown item type or truncated data, raised on every access
+            self._error = e
 
-            size = factory.item_size()
-            rest = rest[size:]
-            yield target
+        self._offsets = offsets
+        self._types = types
 
     def as_list(self):
         res = []
@@ -86,6 +139,6 @@ class LnkTargets:
                 res.append(target.as_item())
             except KeyError as e:
                 msg = "Error while target `%s` (KeyError %s)" % (target.name, e)
-                warnings.warn(msg)
+                self.ctx.report(TARGET_ERROR, msg, target._raw_target.start)
                 continue
         return res
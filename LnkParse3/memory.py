@@ -0,0 +1,149 @@
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+from LnkParse3.metrics import Metrics
+
+"""
+Opt-in memory accounting of parsing, with tracemalloc. Each file gets
+a `FileMemory` record: its size, the peak of memory allocated while it was
+parsed (Python 3.9+, None before) and the memory still allocated after the
+parse (the result of the handler, and anything else that outlived it).
+The metrics of the parse count the net allocations of each stage, that is of
+each section and each target item and extra block class. A `MemoryReport`
+sums the records of a run and flags the files which allocate more than
+`ratio` times their size.
+
+Tracing slows parsing down several times, it is meant for finding out where
+memory goes, not for production runs.
+"""
+
+DEFAULT_RATIO = 100
+DEFAULT_LIMIT = 100
+
+# tracemalloc.reset_peak is new in Python 3.9
+_reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+FileMemory = namedtuple("FileMemory", ["path", "size", "peak", "retained", "metrics"])
+
+
+@contextmanager
+def tracing():
+    """
+    Trace allocations in the block, unless tracemalloc is tracing already.
+    """
+    if tracemalloc.is_tracing():
+        yield
+        return
+
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        tracemalloc.stop()
+
+
+def measure(parse, path, ctx):
+    """
+    Call `parse(path)`, which parses the file with the context `ctx`, and
+    return its result with the `FileMemory` of the file. tracemalloc must
+    be tracing and the metrics of `ctx` enabled.
+    """
+    ctx.reset()
+    if _reset_peak is not None:
+        _reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+
+    result = parse(path)
+
+    peak = tracemalloc.get_traced_memory()[1] - before
+    size = len(ctx.data)
+    metrics = ctx.metrics
+    # Release the data and the decoded structures of the file
+    ctx.reset()
+    retained = tracemalloc.get_traced_memory()[0] - before
+
+    if _reset_peak is None:
+        peak = None
+    return result, FileMemory(path, size, peak, retained, metrics)
+
+
+class MemoryReport:
+    """
+    Memory of the files of a run. `flagged` lists (up to `limit`) the
+    records of the files whose peak, or retained memory if the peak is not
+    known, is over `ratio` times their size; `over` counts all of them.
+    `metrics` holds the allocations by stage.
+    """
+
+    def __init__(self, ratio=DEFAULT_RATIO, limit=DEFAULT_LIMIT):
+        self.ratio = ratio
+        self.limit = limit
+        self.files = 0
+        self.nbytes = 0
+        self.retained = 0
+        # The record of the file with the highest peak
+        self.largest = None
+        self.flagged = []
+        self.over = 0
+        self.metrics = Metrics()
+
+    def add(self, record):
+        self.files += 1
+        self.nbytes += record.size
+        self.retained += record.retained
+        if record.metrics is not None:
+            self.metrics.merge(record.metrics)
+
+        allocated = self._allocated(record)
+        if self.largest is None or allocated > self._allocated(self.largest):
+            self.largest = record
+        if allocated > self.ratio * record.size:
+            self.over += 1
+            if len(self.flagged) < self.limit:
+                self.flagged.append(record)
+
+    @staticmethod
+    def _allocated(record):
+        return record.retained if record.peak is None else record.peak
+
+    def format(self):
+        """
+        Totals, the allocations by stage (the largest first) and the flagged
+        files.
+        """
+        lines = [
+            "files: %d, bytes: %d, retained: %d"
+            % (self.files, self.nbytes, self.retained)
+        ]
+        if self.largest is not None:
+            lines.append(
+                "largest: %s (%d bytes, peak %s, retained %d)"
+                % (
+                    self.largest.path,
+                    self.largest.size,
+                    self.largest.peak,
+                    self.largest.retained,
+                )
+            )
+
+        lines.append("%-36s %10s %12s %10s" % ("stage", "calls", "allocated", "mean"))
+        stages = sorted(
+            self.metrics.stages.items(), key=lambda item: -item[1].allocated
+        )
+        for name, stage in stages:
+            lines.append(
+                "%-36s %10d %12d %10d"
+                % (name, stage.calls, stage.allocated, stage.allocated / stage.calls)
+            )
+
+        lines.append(
+            "files allocating more than %g times their size: %d"
+            % (self.ratio, self.over)
+        )
+        for record in self.flagged:
+            lines.append(
+                "%s: %d bytes, peak %s, retained %d"
+                % (record.path, record.size, record.peak, record.retained)
+            )
+        return "\n".join(lines)
@@ -0,0 +1,170 @@
+import functools
+import tracemalloc
+from contextlib import nullcontext
+from time import perf_counter
+
+"""
+Opt-in instrumentation of parsing. With profiling enabled, the parse context
+of each file gets a `Metrics` object, which totals the wall time, the bytes
+consumed and the calls of every stage: locating and decoding the sections
+(header, targets, link_info, string_data, extras) and decoding each target
+item and extra block class ("target.<class>", "extra.<class>"). Stages may
+nest, e.g. "extras" includes the blocks decoded while walking it; a stage
+already running is not counted twice. Without profiling, the hooks cost one
+attribute lookup. If tracemalloc is tracing when the metrics are created,
+the net bytes allocated by each stage (still held when it ends) are counted
+as well, see `LnkParse3.memory`.
+"""
+
+_UNTIMED = nullcontext()
+
+
+class StageMetrics:
+    __slots__ = ("calls", "seconds", "nbytes", "allocated")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.nbytes = 0
+        self.allocated = 0
+
+
+class _Timing:
+    __slots__ = ("metrics", "name", "nbytes", "start")
+
+    def __init__(self, metrics, name, nbytes):
+        self.metrics = metrics
+        self.name = name
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.start = self.metrics._start(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics._stop(self.name, self.start, self.nbytes)
+
+
+class Metrics:
+    """
+    Totals by stage, see `StageMetrics`. Metrics of many files are summed
+    with `merge`.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.stages = {}
+        self._active = set()
+        self._traced = tracemalloc.is_tracing()
+
+    def add(self, name, seconds, nbytes=0, calls=1, allocated=0):
+        try:
+            stage = self.stages[name]
+        except KeyError:
+            stage = self.stages[name] = StageMetrics()
+        stage.calls += calls
+        stage.seconds += seconds
+        stage.nbytes += nbytes
+        stage.allocated += allocated
+
+    def merge(self, other):
+        self.files += other.files
+        for name, stage in other.stages.items():
+            self.add(name, stage.seconds, stage.nbytes, stage.calls, stage.allocated)
+
+    def stage(self, name, nbytes=0):
+        """
+        Context manager timing a block of code as a call of stage `name`.
+        """
+        return _Timing(self, name, nbytes)
+
+    def _traced_memory(self):
+        if not self._traced:
+            return 0
+        return tracemalloc.get_traced_memory()[0]
+
+    def _start(self, name):
+        if name in self._active:
+            return None
+        self._active.add(name)
+        return perf_counter(), self._traced_memory()
+
+    def _stop(self, name, start, nbytes=0):
+        if start is None:
+            return
+        self._active.discard(name)
+        started, memory = start
+        allocated = self._traced_memory() - memory
+        self.add(name, perf_counter() - started, nbytes, allocated=allocated)
+
+    def format(self):
+        """
+        Table of the stages, the slowest first.
+        """
+        lines = [
+            "%-36s %10s %12s %12s %10s"
+            % ("stage", "calls", "bytes", "total ms", "mean us")
+        ]
+        stages = sorted(self.stages.items(), key=lambda item: -item[1].seconds)
+        for name, stage in stages:
+            lines.append(
+                "%-36s %10d %12d %12.3f %10.2f"
+                % (
+                    name,
+                    stage.calls,
+                    stage.nbytes,
+                    stage.seconds * 1e3,
+                    stage.seconds * 1e6 / stage.calls,
+                )
+            )
+        lines.append("files: %d" % self.files)
+        return "\n".join(lines)
+
+    # The set of running stages is per parse, not state to copy
+    def __getstate__(self):
+        return {"files": self.files, "stages": self.stages}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._active = set()
+        self._traced = False
+
+
+def stage(metrics, name, nbytes=0):
+    """
+    `metrics.stage(name, nbytes)`, or a no-op if `metrics` is None.
+    """
+    if metrics is None:
+        return _UNTIMED
+    return metrics.stage(name, nbytes)
+
+
+def timed(name, size=None):
+    """
+    Time the calls of a method as stage `name` ("%s" is replaced by the
+    class name) in the metrics of the parse context `self.ctx`, if any.
+    `size(self, *args)` returns the number of bytes consumed, it is called
+    after the method.
+    """
+
+    def outer(func):
+        @functools.wraps(func)
+        def inner(self, *args, **kwargs):
+            metrics = self.ctx.metrics
+            if metrics is None:
+                return func(self, *args, **kwargs)
+
+            stage_name = name % type(self).__name__ if "%s" in name else name
+            start = metrics._start(stage_name)
+            nbytes = 0
+            try:
+                result = func(self, *args, **kwargs)
+                if size is not None:
+                    nbytes = size(self, *args)
+                return result
+            finally:
+                metrics._stop(stage_name, start, nbytes)
+
+        return inner
+
+    return outer
@@ -0,0 +1,79 @@
+import copy
+import weakref
+
+from LnkParse3.cursor import Cursor
+from LnkParse3.diagnostics import INVALID_VALUE
+from LnkParse3.diagnostics import LENIENT
+from LnkParse3.diagnostics import STRICT
+from LnkParse3.diagnostics import VALIDATION_LEVELS
+from LnkParse3.diagnostics import Diagnostic
+from LnkParse3.diagnostics import Diagnostics
+from LnkParse3.diagnostics import ValidationError
+from LnkParse3.metrics import Metrics
+from LnkParse3.text_processor import TextProcessor
+
+"""
+A ParseContext is created once per parsed file and handed to every structure
+of that file. It holds the input buffer, the code page with its text
+processor (the codec is resolved only once), the sink for diagnostics, the
+output mode and validation level, and per-file metrics when profiling.
+A context can be reset and reused for the next file; a file binds its own copy
+of it, so that sections decoded later still report to the sinks of that file.
+Decoded structures refer to their context, so the context must not refer to
+them.
+"""
+
+
+class ParseContext:
+    def __init__(
+        self, data=None, cp=None, raw=False, validation=LENIENT, profile=False
+    ):
+        if validation not in VALIDATION_LEVELS:
+            raise ValueError("Unknown validation level: %s" % validation)
+        self.cp = cp
+        # Raw mode: ints, GUID bytes and FILETIME/DOS values, no formatting
+        self.raw = raw
+        self.validation = validation
+        self.profile = profile
+        # A proxy, the context and its data are not left to the cyclic GC
+        self.text_processor = TextProcessor(cp=cp, ctx=weakref.proxy(self))
+        self.reset(data)
+
+    def reset(self, data=None):
+        self.data = Cursor.wrap(data)
+        # A new sink, the previous file may keep its own
+        self.diagnostics = Diagnostics()
+        self.metrics = Metrics() if self.profile else None
+
+    def bind(self):
+        """
+        A copy of the context for the current file, it keeps the data and the
+        sinks of the file when this context is reset for the next one. The
+        resolved codec is shared.
+        """
+        ctx = copy.copy(self)
+        ctx.text_processor = copy.copy(self.text_processor)
+        ctx.text_processor.ctx = weakref.proxy(ctx)
+        return ctx
+
+    @classmethod
+    def ensure(cls, ctx=None, cp=None, raw=False, validation=LENIENT, profile=False):
+        """
+        Structures created on their own (not by LnkFile) get a fresh context.
+        """
+        if ctx is not None:
+            return ctx
+        return cls(cp=cp, raw=raw, validation=validation, profile=profile)
+
+    def report(self, code, message, offset=None):
+        self.diagnostics.add(code, message, offset)
+
+    def invalid(self, name, expected, value, offset=None):
+        """
+        Report that `name` is `value` instead of `expected`. Callers skip
+        the check with validation "off".
+        """
+        msg = "%s must be %s: %s" % (name, expected, value)
+        if self.validation == STRICT:
+            raise ValidationError(Diagnostic(INVALID_VALUE, offset, msg))
+        self.report(INVALID_VALUE, msg, offset)
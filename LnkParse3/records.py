@@ -0,0 +1,238 @@
+from struct import pack
+from struct import unpack
+
+from LnkParse3.extra_data import ExtraData
+from LnkParse3.extra_factory import ExtraFactory
+from LnkParse3.info_factory import InfoFactory
+from LnkParse3.lnk_file import HEADER_JSON
+from LnkParse3.lnk_file import _json_fields
+from LnkParse3.lnk_file import _link_info_json
+from LnkParse3.lnk_file import _target_json
+from LnkParse3.lnk_file import datetime_to_str
+from LnkParse3.lnk_header import LnkHeader
+from LnkParse3.lnk_header import LnkHeaderFields
+from LnkParse3.lnk_info import LnkInfo
+from LnkParse3.lnk_targets import LnkTargets
+from LnkParse3.parse_context import ParseContext
+from LnkParse3.target_factory import TargetFactory
+
+"""
+Compact results, for keeping many parsed files in memory. A `LnkRecord`
+holds the header fields as ints (`HeaderRecord`), the strings, and the
+bytes of the LinkTargetIDList, LinkInfo and ExtraData structures only (not
+the rest of the file), instead of the nested dicts of `get_json`. Shell
+items and extra blocks are given as `ShellItemRecord` and `ExtraBlockRecord`
+on request. Values are formatted when `to_dict` is called, which gives the
+output of `get_json`.
+"""
+
+STRING_KEYS = (
+    "description",
+    "relative_path",
+    "working_directory",
+    "command_line_arguments",
+    "icon_location",
+)
+
+# FILETIME fields of the header, as ints in a `HeaderRecord`
+TIME_FIELDS = ("creation_time", "access_time", "write_time")
+
+
+class HeaderRecord:
+    """
+    Fields of the ShellLinkHeader (see `LnkHeaderFields`), FILETIMEs and
+    flags as ints, LinkCLSID as bytes.
+    """
+
+    __slots__ = LnkHeaderFields.__slots__
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_header(cls, header):
+        values = []
+        for name in cls.__slots__:
+            value = getattr(header._fields, name)
+            if name in TIME_FIELDS:
+                value = unpack("<q", value)[0]
+            elif name == "link_cls_id" and value == LnkHeader.LINK_CLSID:
+                # Shared by all records
+                value = LnkHeader.LINK_CLSID
+            else:
+                value = int(value) if isinstance(value, int) else value
+            values.append(value)
+        return cls(values)
+
+    def pack(self):
+        """
+        The header as in the file.
+        """
+        values = []
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if name in TIME_FIELDS:
+                value = pack("<q", value)
+            values.append(value)
+        return LnkHeader.STRUCT.pack(*values)
+
+    def to_dict(self, get_all=False, format_times=False, ctx=None):
+        header = LnkHeader(indata=self.pack(), ctx=ParseContext.ensure(ctx))
+        fmt = datetime_to_str if format_times else None
+        return _json_fields(header, HEADER_JSON, get_all, fmt)
+
+
+class ShellItemRecord:
+    """
+    An ItemID of the LinkTargetIDList: its type and its data, a window into
+    the IDList from the start of the item (some items read past their
+    ItemIDSize).
+    """
+
+    __slots__ = ("item_type", "data", "ctx")
+
+    def __init__(self, item_type, data, ctx=None):
+        self.item_type = item_type
+        self.data = data
+        self.ctx = ctx
+
+    def target(self):
+        target_class = TargetFactory.class_for(self.item_type)
+        return target_class(indata=self.data, ctx=ParseContext.ensure(self.ctx))
+
+    def to_dict(self):
+        return self.target().as_item()
+
+
+class ExtraBlockRecord:
+    """
+    An ExtraData block: its BlockSignature and bytes.
+    """
+
+    __slots__ = ("signature", "data", "ctx")
+
+    def __init__(self, signature, data, ctx=None):
+        self.signature = signature
+        self.data = data
+        self.ctx = ctx
+
+    def block(self):
+        block_class = ExtraFactory(indata=self.data).extra_class()
+        return block_class(indata=self.data, ctx=ParseContext.ensure(self.ctx))
+
+    def name(self):
+        return self.block().name()
+
+    def to_dict(self):
+        return self.block().as_dict()
+
+
+class LnkRecord:
+    """
+    A parsed file, see the module documentation. `id_list` and `link_info`
+    are None if the file has no such structure.
+    """
+
+    __slots__ = (
+        "header",
+        *STRING_KEYS,
+        "id_list",
+        "target_index",
+        "link_info",
+        "extra_data",
+        "cp",
+        "raw",
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def from_lnk(cls, lnk):
+        """
+        Record of the `LnkFile` `lnk`. Its sections are decoded (their
+        bounds), but no values are formatted.
+        """
+        strings = lnk.string_data.as_dict()
+        values = {key: strings.get(key) for key in STRING_KEYS}
+
+        targets = lnk.targets
+        if targets is not None:
+            start = lnk._sections["targets"]
+            values["id_list"] = bytes(lnk._data[start : start + targets.size()])
+
+        info = lnk.info
+        if info is not None:
+            start = lnk._sections["info"]
+            values["link_info"] = bytes(lnk._data[start : start + info.size()])
+
+        # Up to the end of the last known block
+        blocks = lnk.extras._entries()
+        end = blocks[-1][2] if blocks else 0
+        values["extra_data"] = bytes(lnk.extras._raw[:end])
+
+        return cls(
+            header=HeaderRecord.from_header(lnk.header),
+            target_index=lnk._target_index,
+            cp=lnk.ctx.cp,
+            raw=lnk.ctx.raw,
+            **values,
+        )
+
+    def _context(self):
+        return ParseContext(cp=self.cp, raw=self.raw)
+
+    def targets(self):
+        """
+        The items of the LinkTargetIDList.
+        """
+        if self.id_list is None:
+            return ()
+        ctx = self._context()
+        targets = LnkTargets(indata=self.id_list, ctx=ctx)
+        items = targets._raw_targets
+        return tuple(
+            ShellItemRecord(item_type, items[offset:], ctx)
+            for offset, item_type in zip(targets._index(), targets._types)
+        )
+
+    def extras(self):
+        """
+        The known blocks of the ExtraData.
+        """
+        ctx = self._context()
+        extras = ExtraData(indata=self.extra_data, ctx=ctx)
+        return tuple(
+            ExtraBlockRecord(signature, self.extra_data[start:end], ctx)
+            for signature, start, end, _ in extras._entries()
+        )
+
+    def to_dict(self, get_all=False, format_times=False):
+        """
+        The dict of `LnkFile.get_json`.
+        """
+        ctx = self._context()
+        fmt = datetime_to_str if format_times else None
+
+        res = {}
+        res["header"] = self.header.to_dict(get_all, format_times, ctx)
+        res["data"] = {
+            key: getattr(self, key)
+            for key in STRING_KEYS
+            if getattr(self, key) is not None
+        }
+        res["extra"] = ExtraData(indata=self.extra_data, ctx=ctx).as_dict()
+
+        if self.id_list is not None:
+            targets = LnkTargets(indata=self.id_list, ctx=ctx)
+            res["target"] = _target_json(targets, self.target_index, get_all, fmt)
+
+        info = None
+        if self.link_info is not None:
+            info_class = InfoFactory(LnkInfo(indata=self.link_info, ctx=ctx))
+            info = info_class.info_class()(indata=self.link_info, ctx=ctx)
+        res["link_info"] = _link_info_json(info, get_all)
+
+        return res
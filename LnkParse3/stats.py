@@ -0,0 +1,254 @@
+import heapq
+import os
+import sys
+import threading
+from bisect import bisect_left
+from collections import Counter
+from collections import namedtuple
+from time import monotonic
+
+"""
+Operational statistics of long batch runs: counters of files, bytes, errors
+(by exception type) and diagnostics (by code), a histogram of the parse
+latency and the slowest files. While a `RunStats` is used as a context
+manager, a thread reports them every `interval` seconds, also when no file
+completes (a stalled run shows as a falling rate): as a progress line on
+a stream and in the Prometheus text format to a file, for the textfile
+collector of node_exporter.
+"""
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+DEFAULT_SLOWEST = 10
+DEFAULT_INTERVAL = 10.0
+
+# Of one parsed file, `diagnostics` are counts by code
+FileStats = namedtuple("FileStats", ["seconds", "size", "diagnostics"])
+
+
+def _label(value):
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return value.replace("\n", "\\n")
+
+
+class RunStats:
+    def __init__(
+        self,
+        slowest=DEFAULT_SLOWEST,
+        interval=DEFAULT_INTERVAL,
+        progress=None,
+        prometheus=None,
+        buckets=LATENCY_BUCKETS,
+    ):
+        """
+        Keep the `slowest` files. While reporting, write a progress line to
+        the text stream `progress` and the metrics to the file `prometheus`
+        (a path), if given, every `interval` seconds.
+        """
+        self.slowest_count = slowest
+        self.interval = interval
+        self.progress = progress
+        self.prometheus = prometheus
+        self.buckets = buckets
+
+        self.started = monotonic()
+        self.files = 0
+        self.failed = 0
+        self.nbytes = 0
+        self.seconds = 0.0
+        # Counts by bucket, the last one is +Inf
+        self.latency = [0] * (len(buckets) + 1)
+        self.errors = Counter()
+        self.diagnostics = Counter()
+        # Heap of (seconds, path)
+        self._slowest = []
+
+        # Files are added while the reporting thread reads
+        self._lock = threading.Lock()
+        self._stop = None
+        self._thread = None
+
+    def add(self, path, record):
+        """
+        Count the file `path` parsed with `record` (a `FileStats`).
+        """
+        with self._lock:
+            self.files += 1
+            self.nbytes += record.size
+            self.seconds += record.seconds
+            self.latency[bisect_left(self.buckets, record.seconds)] += 1
+            self.diagnostics.update(record.diagnostics)
+
+            item = (record.seconds, path)
+            if len(self._slowest) < self.slowest_count:
+                heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def add_error(self, path, error):
+        """
+        Count the file `path` which failed with `error` (as in `ParseResult`,
+        "Type: message").
+        """
+        with self._lock:
+            self.files += 1
+            self.failed += 1
+            self.errors[error.partition(":")[0]] += 1
+
+    def elapsed(self):
+        return monotonic() - self.started
+
+    def slowest(self):
+        """
+        (seconds, path) of the slowest files, the slowest first.
+        """
+        with self._lock:
+            return sorted(self._slowest, reverse=True)
+
+    def _rates(self):
+        elapsed = self.elapsed()
+        if not elapsed:
+            return 0.0, 0.0
+        return self.files / elapsed, self.nbytes / elapsed
+
+    def format_progress(self):
+        with self._lock:
+            files_rate, bytes_rate = self._rates()
+            line = "%d files, %d failed, %d diagnostics, %.1f files/s, %.1f kB/s, %ds"
+            return line % (
+                self.files,
+                self.failed,
+                sum(self.diagnostics.values()),
+                files_rate,
+                bytes_rate / 1000,
+                self.elapsed(),
+            )
+
+    def format_prometheus(self):
+        """
+        The statistics in the Prometheus text exposition format.
+        """
+        lines = []
+
+        def metric(name, kind, text, samples):
+            lines.append("# HELP lnkparse_%s %s" % (name, text))
+            lines.append("# TYPE lnkparse_%s %s" % (name, kind))
+            for suffix, labels, value in samples:
+                labels = ",".join('%s="%s"' % (k, _label(v)) for k, v in labels)
+                if labels:
+                    labels = "{%s}" % labels
+                lines.append("lnkparse_%s%s%s %s" % (name, suffix, labels, value))
+
+        with self._lock:
+            files_rate, bytes_rate = self._rates()
+            metric(
+                "files_total",
+                "counter",
+                "Files processed, the failed ones included.",
+                [("", (), self.files)],
+            )
+            metric(
+                "failed_files_total",
+                "counter",
+                "Files which could not be parsed, by error.",
+                [("", (("error", k),), v) for k, v in sorted(self.errors.items())],
+            )
+            metric("bytes_total", "counter", "Bytes parsed.", [("", (), self.nbytes)])
+            metric(
+                "diagnostics_total",
+                "counter",
+                "Diagnostics of the parsed files, by code.",
+                [("", (("code", k),), v) for k, v in sorted(self.diagnostics.items())],
+            )
+            metric(
+                "files_per_second",
+                "gauge",
+                "Files parsed per second since the start.",
+                [("", (), "%.3f" % files_rate)],
+            )
+            metric(
+                "bytes_per_second",
+                "gauge",
+                "Bytes parsed per second since the start.",
+                [("", (), "%.3f" % bytes_rate)],
+            )
+
+            samples = []
+            count = 0
+            bounds = ["%g" % bound for bound in self.buckets] + ["+Inf"]
+            for bound, files in zip(bounds, self.latency):
+                count += files
+                samples.append(("_bucket", (("le", bound),), count))
+            samples.append(("_sum", (), "%.6f" % self.seconds))
+            samples.append(("_count", (), count))
+            metric(
+                "parse_seconds",
+                "histogram",
+                "Time to parse a file (which did not fail).",
+                samples,
+            )
+
+            metric(
+                "slowest_file_seconds",
+                "gauge",
+                "Time to parse the slowest files.",
+                [
+                    ("", (("path", path),), "%.6f" % seconds)
+                    for seconds, path in sorted(self._slowest, reverse=True)
+                ],
+            )
+            metric(
+                "elapsed_seconds",
+                "gauge",
+                "Time since the start of the run.",
+                [("", (), "%.3f" % self.elapsed())],
+            )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Replace the file `path` atomically, a collector never reads half of
+        it.
+        """
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp, "w") as fhandle:
+            fhandle.write(self.format_prometheus())
+        os.replace(tmp, path)
+
+    def report(self, final=False):
+        """
+        Write the progress line and the Prometheus file, if enabled. On
+        a terminal, the progress line is rewritten in place.
+        """
+        if self.progress is not None:
+            line = self.format_progress()
+            if self.progress.isatty():
+                self.progress.write("\r\x1b[K" + line + ("\n" if final else ""))
+            else:
+                self.progress.write(line + "\n")
+            self.progress.flush()
+        if self.prometheus is not None:
+            self.write_prometheus(self.prometheus)
+
+    def _run(self):
+        failed = False
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except OSError as e:
+                # The run goes on, the reports are retried (and the error is
+                # printed once)
+                if not failed:
+                    print("Cannot report statistics: %s" % e, file=sys.stderr)
+                    failed = True
+
+    def __enter__(self):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.report(final=True)
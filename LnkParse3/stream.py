@@ -0,0 +1,139 @@
+import os
+from struct import unpack_from
+
+from LnkParse3.flags import LinkFlags
+
+"""
+Bounded reading of a LNK file. The size fields of the structures (header,
+IDListSize, LinkInfoSize, StringData character counts and ExtraData block
+sizes up to the terminal block) are followed and only the bytes they cover
+are read. Anything after the terminal block (e.g. an appended payload) is
+measured, never loaded.
+"""
+
+HEADER_SIZE = 0x4C
+TERMINAL_BLOCK_SIZE = 4
+
+STRING_DATA_FLAGS = (
+    LinkFlags.HAS_NAME,
+    LinkFlags.HAS_RELATIVE_PATH,
+    LinkFlags.HAS_WORKING_DIR,
+    LinkFlags.HAS_ARGUMENTS,
+    LinkFlags.HAS_ICON_LOCATION,
+)
+
+
+class BufferSource:
+    """
+    Data already in memory (bytes, mmap, Cursor...).
+    """
+
+    def __init__(self, data):
+        self._data = data
+
+    def ensure(self, size):
+        return len(self._data) >= size
+
+    def unpack(self, fmt, offset):
+        return unpack_from(fmt, self._data, offset)
+
+
+class StreamSource:
+    """
+    File object read incrementally, only as far as requested.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, fhandle):
+        self._fhandle = fhandle
+        self._buffer = bytearray()
+        self._eof = False
+
+    def ensure(self, size):
+        # In pieces, sizes come from the file and may be far beyond its end
+        while len(self._buffer) < size and not self._eof:
+            chunk = self._fhandle.read(min(size - len(self._buffer), self.CHUNK_SIZE))
+            if not chunk:
+                self._eof = True
+            self._buffer += chunk
+        return len(self._buffer) >= size
+
+    def unpack(self, fmt, offset):
+        return unpack_from(fmt, self._buffer, offset)
+
+    def data(self):
+        return bytes(self._buffer)
+
+    def remaining(self):
+        """
+        Number of bytes left in the file after the data read so far.
+        """
+        if self._eof:
+            return 0
+
+        try:
+            position = self._fhandle.tell()
+            size = os.fstat(self._fhandle.fileno()).st_size
+            return max(size - position, 0)
+        except (AttributeError, OSError, ValueError):
+            pass
+
+        remaining = 0
+        while True:
+            chunk = self._fhandle.read(self.CHUNK_SIZE)
+            if not chunk:
+                return remaining
+            remaining += len(chunk)
+
+
+def structure_size(source):
+    """
+    Size of the LNK structures (everything up to and including the terminal
+    block of ExtraData), following the same offsets as `LnkFile.process`.
+    Stops early on truncated data.
+    """
+    if not source.ensure(HEADER_SIZE):
+        return HEADER_SIZE
+    index = source.unpack("<I", 0)[0]
+    flags = source.unpack("<I", 20)[0]
+
+    if flags & LinkFlags.HAS_TARGET_ID_LIST:
+        if not source.ensure(index + 2):
+            return index + 2
+        index += 2 + source.unpack("<H", index)[0]
+
+    if flags & LinkFlags.HAS_LINK_INFO and not flags & LinkFlags.FORCE_NO_LINK_INFO:
+        if not source.ensure(index + 12):
+            return index + 12
+        info_size = source.unpack("<I", index)[0]
+        info_flags = source.unpack("<I", index + 8)[0]
+        # Neither Local nor Network (see InfoFactory), LnkFile does not skip it
+        if info_flags & 0x0003:
+            index += info_size
+
+    char_size = 2 if flags & LinkFlags.IS_UNICODE else 1
+    for flag in STRING_DATA_FLAGS:
+        if flags & flag:
+            if not source.ensure(index + 2):
+                return index + 2
+            index += 2 + source.unpack("<H", index)[0] * char_size
+
+    while True:
+        if not source.ensure(index + TERMINAL_BLOCK_SIZE):
+            return index + TERMINAL_BLOCK_SIZE
+        block_size = source.unpack("<I", index)[0]
+        if block_size < TERMINAL_BLOCK_SIZE:
+            return index + TERMINAL_BLOCK_SIZE
+        index += block_size
+
+
+def read_structure(fhandle):
+    """
+    Read the LNK structures from the current position of `fhandle`.
+    Returns the bytes read and the number of bytes left after them.
+    """
+    source = StreamSource(fhandle)
+    size = structure_size(source)
+    source.ensure(size)
+    return source.data(), source.remaining()
@@ -1,5 +1,6 @@
-from struct import unpack
-from LnkParse3.text_processor import TextProcessor
+from LnkParse3.cursor import Cursor
+from LnkParse3.metrics import timed
+from LnkParse3.parse_context import ParseContext
 
 """
 STRING_DATA:
@@ -11,38 +12,34 @@ ShellLinkHeader.
 
 
 class StringData:
-    def __init__(self, lnk_file, indata=None, cp=None):
-        self._raw = indata
+    def __init__(self, lnk_file, indata=None, cp=None, ctx=None):
+        self._raw = Cursor.wrap(indata)
         self._data = {}
 
-        self._lnk_file = lnk_file
-        self.text_processor = TextProcessor(cp=cp)
+        self.ctx = ParseContext.ensure(ctx, cp)
+        self.text_processor = self.ctx.text_processor
+
+        if lnk_file.is_unicode():
+            self._read = self.text_processor.read_unicode_string
+            self._char_size = 2  # UTF-16
+        else:
+            self._read = self.text_processor.read_string
+            self._char_size = 1
+
+        self._spans = {}
 
         start = 0
-        if self._lnk_file.has_name():
-            text, length = self.read(self._raw[start:])
-            self._data["description"] = text
-            start += length
-
-        if self._lnk_file.has_relative_path():
-            text, length = self.read(self._raw[start:])
-            self._data["relative_path"] = text
-            start += length
-
-        if self._lnk_file.has_working_dir():
-            text, length = self.read(self._raw[start:])
-            self._data["working_directory"] = text
-            start += length
-
-        if self._lnk_file.has_arguments():
-            text, length = self.read(self._raw[start:])
-            self._data["command_line_arguments"] = text
-            start += length
-
-        if self._lnk_file.has_icon_location():
-            text, length = self.read(self._raw[start:])
-            self._data["icon_location"] = text
-            start += length
+        for key, present in (
+            ("description", lnk_file.has_name),
+            ("relative_path", lnk_file.has_relative_path),
+            ("working_directory", lnk_file.has_working_dir),
+            ("command_line_arguments", lnk_file.has_arguments),
+            ("icon_location", lnk_file.has_icon_location),
+        ):
+            if present():
+                length = self._length(self._raw[start:])
+                self._spans[key] = (start, length)
+                start += length
 
         self._size = start
 
@@ -50,33 +47,51 @@ class StringData:
         return self._size
 
     def description(self):
-        return self._data.get("description")
+        return self._text("description")
 
     def relative_path(self):
-        return self._data.get("relative_path")
+        return self._text("relative_path")
 
     def working_directory(self):
-        return self._data.get("working_directory")
+        return self._text("working_directory")
 
     def command_line_arguments(self):
-        return self._data.get("command_line_arguments")
+        return self._text("command_line_arguments")
 
     def icon_location(self):
-        return self._data.get("icon_location")
-
+        return self._text("icon_location")
+
+    def _text(self, key):
+        """
+        Strings are decoded on the first access only.
+        """
+        if key not in self._data:
+            span = self._spans.get(key)
+            if span is None:
+                return None
+            start, length = span
+            self._data[key], _ = self.read(self._raw[start : start + length])
+        return self._data[key]
+
+    def _length(self, binary):
+        char_count = binary.unpack("<H")[0]
+        return 2 + char_count * self._char_size
+
+    @timed("string_data", lambda self, binary: len(binary))
     def read(self, binary):
         offset = 2
-        char_count = unpack("<H", binary[0:offset])[0]
-        length = char_count
-
-        if self._lnk_file.is_unicode():
-            self._read = self.text_processor.read_unicode_string
-            length *= 2  # UTF-16
-        else:
-            self._read = self.text_processor.read_string
+        char_count = binary.unpack("<H")[0]
+        length = char_count * self._char_size
 
         text = self._read(binary[offset : offset + length])
         return text, offset + length
 
-    def as_dict(self):
-        return {k: v for k, v in self._data.items() if v is not None}
+    def as_dict(self, select=None):
+        """
+        Strings present in the file, or only those in `select` if given.
+        """
+        keys = self._spans
+        if select is not None:
+            keys = [key for key in keys if key in select]
+        res = {key: self._text(key) for key in keys}
+        return {k: v for k, v in res.items() if v is not None}
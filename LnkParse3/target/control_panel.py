@@ -7,4 +7,4 @@ class ControlPanel(LnkTargetBase):
     @uuid
     def control_panel_item_identifier(self):
         start, end = 14, 30
-        return self._raw_target[start:end]
+        return self._raw_target.view(start, end)
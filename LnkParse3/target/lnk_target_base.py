@@ -1,5 +1,6 @@
-from struct import unpack
-from LnkParse3.text_processor import TextProcessor
+from LnkParse3.cursor import Cursor
+from LnkParse3.metrics import timed
+from LnkParse3.parse_context import ParseContext
 
 """
 An ItemID is an element in an IDList structure (section 2.2.1). The data stored
@@ -26,19 +27,22 @@ class LnkTargetBase:
         0x80: "Has CLSID",
     }
 
+    HAS_UNICODE_STRINGS = 0x04
+
     SIZE_OF_TARGET_SIZE = 2
 
-    def __init__(self, indata=None, cp=None):
+    def __init__(self, indata=None, cp=None, ctx=None):
         self._target = {}
-        self.cp = cp
-        self._raw = indata
+        self.ctx = ParseContext.ensure(ctx, cp)
+        self._raw = Cursor.wrap(indata)
 
-        self.text_processor = TextProcessor(cp=self.cp)
+        self.text_processor = self.ctx.text_processor
 
         start = self.SIZE_OF_TARGET_SIZE
         end = start + self.size()
         self._raw_target = self._raw[start:end]
 
+    @timed("target.%s", lambda self: self.size())
     def as_item(self):
         return {
             "class": self.name,
@@ -49,16 +53,14 @@ class LnkTargetBase:
         A 16-bit, unsigned integer that specifies the size, in bytes, of the
         ItemID structure, including the ItemIDSize field.
         """
-        start, end = 0, 2
-        size = unpack("<H", self._raw[start:end])[0]
+        start = 0
+        size = self._raw.unpack("<H", start)[0]
         return size
 
     def class_type_indicator(self):
-        start, end = 0, 1
-        flags = unpack("<B", self._raw_target[start:end])[0]
+        start = 0
+        flags = self._raw_target.unpack("<B", start)[0]
         return flags
 
     def has_unicode_strings(self):
-        inv = {v: k for k, v in self.SHELL_ITEM_SHEL_FS_FOLDER.items()}
-        mask = inv["Has Unicode strings"]
-        return bool(self.class_type_indicator() & mask)
+        return bool(self.class_type_indicator() & self.HAS_UNICODE_STRINGS)
@@ -1,4 +1,5 @@
-from struct import unpack
+from LnkParse3.decorators import formatted
+from LnkParse3.metrics import timed
 from LnkParse3.target.lnk_target_base import LnkTargetBase
 
 """
@@ -20,6 +21,7 @@ class MyComputer(LnkTargetBase):
         self.name = "Volume Item"
         super().__init__(*args, **kwargs)
 
+    @timed("target.%s", LnkTargetBase.size)
     def as_item(self):
         item = super().as_item()
         item["flags"] = self.flags()
@@ -28,12 +30,12 @@ class MyComputer(LnkTargetBase):
 
     # dup: ./shell_fs_folder.py flags()
     # dup: ../target_factory.py item_type()
+    @formatted(hex)
     def flags(self):
         flags = self.class_type_indicator()
 
         # FIXME: delete masking
-        # FIXME: hex() is only used here
-        return hex(flags & 0x0F)
+        return flags & 0x0F
 
     def data(self):
         start = 1
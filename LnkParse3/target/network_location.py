@@ -1,4 +1,4 @@
-from struct import unpack
+from LnkParse3.metrics import timed
 from LnkParse3.target.lnk_target_base import LnkTargetBase
 
 """
@@ -41,6 +41,7 @@ class NetworkLocation(LnkTargetBase):
         if self._has_comments():
             self._comments = next(it)
 
+    @timed("target.%s", LnkTargetBase.size)
     def as_item(self):
         item = super().as_item()
         item["flags"] = self.flags()
@@ -50,8 +51,8 @@ class NetworkLocation(LnkTargetBase):
 
     # TODO: rename to class_type_indicator
     def flags(self):
-        start, end = 0, 1
-        flags = unpack("<B", self._raw_target[start:end])[0]
+        start = 0
+        flags = self._raw_target.unpack("<B", start)[0]
         return self.SHELL_ITEM_SHEL_FS_FOLDER[flags & 0x0F]
 
     def content_flags(self):
@@ -59,8 +60,8 @@ class NetworkLocation(LnkTargetBase):
         0x40 ⇒ has comments
         0x80 ⇒ has description
         """
-        start, end = 2, 6
-        flags = unpack("<I", self._raw_target[start:end])[0]
+        start = 2
+        flags = self._raw_target.unpack("<I", start)[0]
         return flags
 
     def _has_comments(self):
@@ -1,4 +1,4 @@
-from struct import unpack
+from LnkParse3.metrics import timed
 from LnkParse3.target.lnk_target_base import LnkTargetBase
 from LnkParse3.decorators import uuid
 
@@ -36,6 +36,7 @@ class RootFolder(LnkTargetBase):
         self.name = "Root Folder"
         super().__init__(*args, **kwargs)
 
+    @timed("target.%s", LnkTargetBase.size)
     def as_item(self):
         item = super().as_item()
         item["sort_index"] = self.sort_index()
@@ -43,14 +44,14 @@ class RootFolder(LnkTargetBase):
         return item
 
     def sort_index(self):
-        start, end = 1, 2
-        index = unpack("<B", self._raw_target[start:end])[0]
+        start = 1
+        index = self._raw_target.unpack("<B", start)[0]
         return self.SORT_INDEX[index]
 
     @uuid
     def guid(self):
         start, end = 2, 18
-        guid = self._raw_target[start:end]
+        guid = self._raw_target.view(start, end)
         return guid
 
     def extension_block(self):
@@ -1,4 +1,4 @@
-from struct import unpack
+from LnkParse3.metrics import timed
 from LnkParse3.target.lnk_target_base import LnkTargetBase
 from LnkParse3.decorators import dostime
 
@@ -32,6 +32,7 @@ class ShellFSFolder(LnkTargetBase):
         self.name = "File entry"
         super().__init__(*args, **kwargs)
 
+    @timed("target.%s", LnkTargetBase.size)
     def as_item(self):
         # FIXME This try-catch is just a hot-fix.
         # We should probably solve failing attributes in a better way.
@@ -55,18 +56,18 @@ class ShellFSFolder(LnkTargetBase):
         return self.SHELL_ITEM_SHEL_FS_FOLDER[flags & 0x0F]
 
     def file_size(self):
-        start, end = 2, 6
-        size = unpack("<I", self._raw_target[start:end])[0]
+        start = 2
+        size = self._raw_target.unpack("<I", start)[0]
         return size
 
-    @dostime
+    @dostime()
     def modification_time(self):
         start, end = 6, 10
         return self._raw_target[start:end]
 
     def file_attribute_flags(self):
-        start, end = 10, 12
-        flags = unpack("<H", self._raw_target[start:end])[0]
+        start = 10
+        flags = self._raw_target.unpack("<H", start)[0]
         return flags
 
     def primary_name(self):
@@ -1,3 +1,4 @@
+from LnkParse3.metrics import timed
 from LnkParse3.target.lnk_target_base import LnkTargetBase
 
 
@@ -6,5 +7,6 @@ class UsersFilesFolder(LnkTargetBase):
         self.name = "Users files folder"
         return super().__init__(*args, **kwargs)
 
+    @timed("target.%s", LnkTargetBase.size)
     def as_item(self):
         return None
@@ -1,4 +1,4 @@
-from struct import unpack
+from LnkParse3.cursor import Cursor
 from LnkParse3.target.unknown import Unknown
 from LnkParse3.target.root_folder import RootFolder
 from LnkParse3.target.my_computer import MyComputer
@@ -37,15 +37,15 @@ class TargetFactory:
 
     def __init__(self, indata):
         self._target = {}
-        self._raw = indata
+        self._raw = Cursor.wrap(indata)
 
     def item_size(self):
         """ItemIDSize (2 bytes):
         A 16-bit, unsigned integer that specifies the size, in bytes, of the
         ItemID structure, including the ItemIDSize field.
         """
-        start, end = 0, 2
-        size = unpack("<H", self._raw[start:end])[0]
+        start = 0
+        size = self._raw.unpack("<H", start)[0]
         return size
 
     # dup: ./targets/shell_fs_folder.py flags()
@@ -54,8 +54,8 @@ class TargetFactory:
         """
         Peek item type before creating objects
         """
-        start, end = 2, 3
-        item_type = unpack("<B", self._raw[start:end])[0]
+        start = 2
+        item_type = self._raw.unpack("<B", start)[0]
         return item_type
 
     def target_class(self):
@@ -63,8 +63,11 @@ class TargetFactory:
             # TerminalID
             return None
 
-        item_type = self.item_type()
-        classes = self.SHELL_ITEM_CLASSES
+        return self.class_for(self.item_type())
+
+    @classmethod
+    def class_for(cls, item_type):
+        classes = cls.SHELL_ITEM_CLASSES
 
         # TODO: ControlPanelShellItems
         # https://github.com/libyal/libfwsi/blob/master/documentation/Windows%20Shell%20Item%20format.asciidoc#43-control-panel-shell-items
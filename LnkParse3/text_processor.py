@@ -5,70 +5,88 @@ than the size of the field that contains it, the bytes in the field following
 the terminating null character are undefined and can have any value. The
 undefined bytes MUST NOT be used.
 """
-import warnings
+import codecs
+
+from LnkParse3.cursor import Cursor
+from LnkParse3.diagnostics import DECODING_ERROR
+
+_decode_unicode = codecs.lookup("utf-16le").decode
 
 
 class TextProcessor:
-    def __init__(self, cp=None):
+    NULL = b"\x00"
+    UNICODE_NULL = b"\x00\x00"
+
+    def __init__(self, cp=None, ctx=None):
         self.cp = cp if cp else "cp1252"
+        self._decode = codecs.lookup(self.cp).decode
+        # Imported here, a parse context creates its own text processor
+        from LnkParse3.parse_context import ParseContext
 
-    def read_strings(self, binary):
-        chars = []
+        # Diagnostics are reported to the parse context
+        self.ctx = ParseContext.ensure(ctx, cp)
 
-        def _chars_to_string(lst):
-            bin_string = b"".join(lst)
-            try:
-                string = bin_string.decode(self.cp)
-            except UnicodeDecodeError as e:
-                string = bin_string.decode(self.cp, errors="replace")
-                msg = "Error while decoding string `%s` (%s)" % (string, e)
-                warnings.warn(msg)
-            yield string
+    def _to_string(self, binary, offset=None):
+        try:
+            string, _ = self._decode(binary)
+        except UnicodeDecodeError as e:
+            string, _ = self._decode(binary, "replace")
+            msg = "Error while decoding string `%s` (%s)" % (string, e)
+            self.ctx.report(DECODING_ERROR, msg, offset)
+        return string
 
-        for char in binary:
-            if char == 0x00:
-                yield from _chars_to_string(chars)
-                chars = []
-            else:
-                chars.append(bytes([char]))
+    def _to_unicode_string(self, binary):
+        string, _ = _decode_unicode(binary)
+        return string
 
-        yield from _chars_to_string(chars)
+    @staticmethod
+    def _offset(binary):
+        # Windows into the data of a file know their offset in it
+        return binary.start if isinstance(binary, Cursor) else None
+
+    def read_strings(self, binary):
+        offset = self._offset(binary)
+        binary = Cursor.wrap(binary)
+        start = 0
+        while True:
+            at = None if offset is None else offset + start
+            end = binary.find(self.NULL, start)
+            if end < 0:
+                yield self._to_string(binary.view(start), at)
+                return
+            yield self._to_string(binary.view(start, end), at)
+            start = end + 1
 
     def read_string(self, binary):
-        it = self.read_strings(binary)
-        return next(it)
+        offset = self._offset(binary)
+        binary = Cursor.wrap(binary)
+        end = binary.find(self.NULL)
+        return self._to_string(binary.view(0, end if end >= 0 else None), offset)
 
     def read_unicode_strings(self, binary):
-        chars = []
-
-        def _chars_to_string(lst):
-            bin_string = b"".join(lst)
-            string = bin_string.decode("utf-16le")
-            yield string
-
-        for char in self._2bytes_each(binary):
-            if char == b"\x00\x00":
-                yield from _chars_to_string(chars)
-                chars = []
-            else:
-                chars.append(char)
-
-        yield from _chars_to_string(chars)
+        binary = Cursor.wrap(binary)
+        start = 0
+        while True:
+            end = self._find_unicode_null(binary, start)
+            if end < 0:
+                yield self._to_unicode_string(binary.view(start))
+                return
+            yield self._to_unicode_string(binary.view(start, end))
+            start = end + 2
 
     def read_unicode_string(self, binary):
-        it = self.read_unicode_strings(binary)
-        return next(it)
+        binary = Cursor.wrap(binary)
+        end = self._find_unicode_null(binary, 0)
+        return self._to_unicode_string(binary.view(0, end if end >= 0 else None))
 
-    @staticmethod
-    def _2bytes_each(binary):
-        it = iter(binary)
+    @classmethod
+    def _find_unicode_null(cls, binary, start):
+        """
+        UTF-16 terminator is a null character aligned to 2 bytes from `start`.
+        """
+        pos = start
         while True:
-            tmp = None
-            try:
-                tmp = bytes([next(it)])
-                tmp += bytes([next(it)])
-                yield tmp
-            except StopIteration:
-                if tmp:
-                    yield tmp
-                return None
+            index = binary.find(cls.UNICODE_NULL, pos)
+            if index < 0 or (index - start) % 2 == 0:
+                return index
+            pos = index + 1
@@ -23,7 +23,7 @@ setup(
     ],
     entry_points={
         'console_scripts': [
-            'lnkparse=LnkParse3.lnk_file:main',
+            'lnkparse=LnkParse3.cli:main',
         ],
     },
 )
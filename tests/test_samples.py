@@ -1,20 +1,62 @@
+import asyncio
+import gc
 import json
+import math
+import mmap
 import os
+import pickle
+import tempfile
+import threading
+import time
+import tracemalloc
 import unittest
-import warnings
+import weakref
+from datetime import datetime
+from datetime import timezone
+from contextlib import redirect_stderr
 from contextlib import redirect_stdout
+from io import BytesIO
 from io import StringIO
+from struct import error as StructError
 
 import LnkParse3
+from LnkParse3 import cli
+from LnkParse3.aio import aiter_parse
+from LnkParse3.aio import parse_async
+from LnkParse3.batch import get_record
+from LnkParse3.batch import iter_paths
+from LnkParse3.cursor import map_file
+from LnkParse3.decorators import dostime_to_datetime
+from LnkParse3.decorators import filetime_to_datetime
+from LnkParse3.decorators import format_uuid
+from LnkParse3.diagnostics import Diagnostic
+from LnkParse3.diagnostics import ValidationError
+from LnkParse3.lnk_targets import LnkTargets
+from LnkParse3.memory import MemoryReport
+from LnkParse3.metrics import Metrics
+from LnkParse3.parse_context import ParseContext
+from LnkParse3.stats import RunStats
 
 TARGET_DIR = os.path.join(os.path.dirname(__file__), 'samples')
 JSON_DIR = os.path.join(os.path.dirname(__file__), 'json')
 
 
+def slow_unknown_target(lnk):
+    # unknown_target is the only sample of its size
+    if len(lnk._data) == 68608:
+        time.sleep(1)
+    return None
+
+
+def exit_on_unknown_target(lnk):
+    if len(lnk._data) == 68608:
+        os._exit(1)
+    return None
+
+
 class TestSamples(unittest.TestCase):
     def setUp(self):
         self.maxDiff = None
-        warnings.simplefilter('ignore', category=UserWarning)
 
     def test_json_print_for_all_samples(self):
         for entry in os.scandir(TARGET_DIR):
@@ -34,6 +76,622 @@ class TestSamples(unittest.TestCase):
 
                 self.assertDictEqual(our, their)
 
+    def test_lazy_parsing_matches_eager_parsing(self):
+        for entry in os.scandir(TARGET_DIR):
+            with self.subTest(msg=entry.name):
+                with open(entry.path, 'rb') as indata:
+                    data = indata.read()
+
+                eager = LnkParse3.lnk_file(indata=data)
+                lazy = LnkParse3.lnk_file(indata=data, lazy=True)
+
+                self.assertEqual(lazy.lnk_command, eager.lnk_command)
+                self.assertEqual(lazy.get_json(True), eager.get_json(True))
+
+    def test_path_input(self):
+        for entry in os.scandir(TARGET_DIR):
+            with self.subTest(msg=entry.name):
+                with open(entry.path, 'rb') as indata:
+                    lnk = LnkParse3.lnk_file(indata)
+
+                read = LnkParse3.lnk_file(path=entry.path)
+                mapped = LnkParse3.lnk_file(path=entry.path, mmap=True)
+                streamed = LnkParse3.lnk_file(path=entry.path, stream=True)
+
+                self.assertEqual(read.get_json(True), lnk.get_json(True))
+                self.assertEqual(mapped.get_json(True), lnk.get_json(True))
+                self.assertEqual(streamed.get_json(True), lnk.get_json(True))
+
+    def test_map_file(self):
+        path = os.path.join(TARGET_DIR, 'microsoft_example')
+        self.assertIsInstance(LnkParse3.lnk_file(path=path).indata, bytes)
+        # Only large regular files are mapped
+        self.assertIsInstance(map_file(path), bytes)
+        self.assertIsInstance(map_file(path, threshold=0), mmap.mmap)
+        if os.path.exists(os.devnull):
+            self.assertEqual(map_file(os.devnull, threshold=0), b'')
+
+    def test_stream_reads_only_lnk_structures(self):
+        payload = b"\x00" * 1024 * 1024
+        for entry in os.scandir(TARGET_DIR):
+            with self.subTest(msg=entry.name):
+                with open(entry.path, 'rb') as indata:
+                    lnk = LnkParse3.lnk_file(indata)
+
+                fhandle = BytesIO(lnk.indata + payload)
+                streamed = LnkParse3.lnk_file(fhandle=fhandle, stream=True)
+
+                self.assertLess(len(streamed.indata), len(payload))
+                self.assertEqual(
+                    streamed.appended_data_size(),
+                    lnk.appended_data_size() + len(payload),
+                )
+                self.assertEqual(streamed.get_json(True), lnk.get_json(True))
+
+    def test_stream_oversized_block_size(self):
+        lnk = LnkParse3.lnk_file(path=os.path.join(TARGET_DIR, 'microsoft_example'))
+        data = bytearray(lnk.indata)
+        offset = lnk._sections['extras']
+        data[offset : offset + 4] = (0xFFFFFFF0).to_bytes(4, 'little')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'oversized')
+            with open(path, 'wb') as fp:
+                fp.write(data)
+
+            tracemalloc.start()
+            try:
+                with open(path, 'rb') as fhandle:
+                    streamed = LnkParse3.lnk_file(fhandle=fhandle, stream=True)
+                self.assertEqual(len(streamed.indata), len(data))
+                streamed = LnkParse3.lnk_file(path=path, stream=True)
+                self.assertEqual(len(streamed.indata), len(data))
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        self.assertLess(peak, 16 * 1024 * 1024)
+
+    def test_peek_header(self):
+        for entry in os.scandir(TARGET_DIR):
+            with self.subTest(msg=entry.name):
+                header = LnkParse3.peek_header(entry.path)
+                with open(entry.path, 'rb') as indata:
+                    lnk = LnkParse3.lnk_file(indata)
+
+                self.assertEqual(header.link_flags(), lnk.header.link_flags())
+                self.assertEqual(header.creation_time(), lnk.header.creation_time())
+
+        self.assertIsNone(LnkParse3.peek_header(BytesIO(b"MZ" + b"\x00" * 100)))
+        self.assertIsNone(LnkParse3.peek_header(BytesIO(b"\x4c\x00\x00\x00")))
+
+    def test_parse_many(self):
+        paths = sorted(entry.path for entry in os.scandir(TARGET_DIR))
+        paths.append(os.path.join(TARGET_DIR, 'does_not_exist'))
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                results = list(
+                    LnkParse3.parse_many(
+                        paths, workers=workers, chunksize=4, ordered=True
+                    )
+                )
+
+                self.assertEqual([result.path for result in results], paths)
+                for result in results[:-1]:
+                    self.assertIsNone(result.error)
+                    lnk = LnkParse3.lnk_file(path=result.path)
+                    self.assertEqual(result.result, lnk.get_json())
+                self.assertIsNone(results[-1].result)
+                self.assertIn('FileNotFoundError', results[-1].error)
+
+    def test_parse_many_ordered_is_bounded(self):
+        consumed = 0
+
+        def paths():
+            nonlocal consumed
+            yield os.path.join(TARGET_DIR, 'unknown_target')
+            for _ in range(200):
+                consumed += 1
+                yield os.path.join(TARGET_DIR, 'microsoft_example')
+
+        results = LnkParse3.parse_many(
+            paths(), workers=2, chunksize=1, ordered=True, handler=slow_unknown_target
+        )
+        first = next(results)
+        self.assertTrue(first.path.endswith('unknown_target'))
+        # workers * 4 chunks, in flight or reordered
+        self.assertLessEqual(consumed, 8)
+        self.assertEqual(len(list(results)), 200)
+
+    def test_parse_many_worker_dies(self):
+        paths = [os.path.join(TARGET_DIR, 'unknown_target')]
+        paths += [os.path.join(TARGET_DIR, 'microsoft_example')] * 20
+
+        results = list(
+            LnkParse3.parse_many(
+                paths,
+                workers=2,
+                chunksize=1,
+                ordered=True,
+                handler=exit_on_unknown_target,
+            )
+        )
+        self.assertEqual([res.path for res in results], paths)
+        self.assertTrue(results[0].error.startswith('BrokenProcessPool: '))
+        # Only the chunks in flight (workers * 4) fail, the rest is parsed in
+        # a new pool
+        failed = [res for res in results if res.error is not None]
+        self.assertLessEqual(len(failed), 8)
+        self.assertEqual(results[-1], (paths[-1], None, None))
+
+    def test_get_json_fields(self):
+        fields = [
+            'header.creation_time',
+            'header.header_size',
+            'data.relative_path',
+            'extra.DISTRIBUTED_LINK_TRACKER_BLOCK.machine_identifier',
+        ]
+        lnk = LnkParse3.lnk_file(path='tests/samples/microsoft_example', lazy=True)
+        res = lnk.get_json(fields=fields)
+
+        full = LnkParse3.lnk_file(path='tests/samples/microsoft_example').get_json(True)
+        self.assertEqual(
+            res,
+            {
+                'header': {
+                    'creation_time': full['header']['creation_time'],
+                    'header_size': 76,
+                },
+                'data': {'relative_path': '.\\a.txt'},
+                'extra': {
+                    'DISTRIBUTED_LINK_TRACKER_BLOCK': {
+                        'machine_identifier': 'chris-xps'
+                    }
+                },
+            },
+        )
+        # Neither targets nor link info were decoded
+        self.assertNotIn('targets', lnk._decoded)
+        self.assertNotIn('info', lnk._decoded)
+
+        lnk = LnkParse3.lnk_file(path='tests/samples/network_info', lazy=True)
+        res = lnk.get_json(fields=['link_info.location_info', 'link_info.location'])
+        full = lnk.get_json()
+        self.assertEqual(
+            res,
+            {
+                'link_info': {
+                    'location_info': full['link_info']['location_info'],
+                    'location': 'Network',
+                }
+            },
+        )
+
+    def test_records(self):
+        paths = sorted(entry.path for entry in os.scandir(TARGET_DIR))
+        for path in paths:
+            with self.subTest(msg=path):
+                lnk = LnkParse3.lnk_file(path=path)
+                record = pickle.loads(pickle.dumps(lnk.get_record()))
+                self.assertEqual(record.to_dict(), lnk.get_json())
+                self.assertEqual(
+                    record.to_dict(True, format_times=True),
+                    lnk.get_json(True, format_times=True),
+                )
+
+        results = LnkParse3.parse_many(paths, workers=2, handler=get_record)
+        for result in results:
+            lnk = LnkParse3.lnk_file(path=result.path)
+            self.assertEqual(result.result.to_dict(), lnk.get_json())
+
+        lnk = LnkParse3.lnk_file(path=os.path.join(TARGET_DIR, 'microsoft_example'))
+        record = lnk.get_record()
+        self.assertEqual(
+            [item.to_dict() for item in record.targets()], lnk.targets.as_list()
+        )
+        self.assertEqual(
+            {block.name(): block.to_dict() for block in record.extras()},
+            lnk.extras.as_dict(),
+        )
+
+    def test_records_memory(self):
+        lnks = [LnkParse3.lnk_file(path=entry.path) for entry in os.scandir(TARGET_DIR)]
+
+        def retained(result):
+            tracemalloc.start()
+            try:
+                kept = [result(lnk) for _ in range(20) for lnk in lnks]
+                return tracemalloc.get_traced_memory()[0] / len(kept)
+            finally:
+                tracemalloc.stop()
+
+        per_dict = retained(lambda lnk: lnk.get_json())
+        per_record = retained(lambda lnk: lnk.get_record())
+        self.assertLess(per_record * 2, per_dict)
+
+    def test_raw_mode(self):
+        lnk = LnkParse3.lnk_file(path='tests/samples/microsoft_example', raw=True)
+        res = lnk.get_json(True)
+        their = LnkParse3.lnk_file(path='tests/samples/microsoft_example').get_json(True)
+
+        header = res['header']
+        self.assertEqual(header['creation_time'], 128657248371010000)
+        self.assertEqual(
+            filetime_to_datetime(header['creation_time']),
+            their['header']['creation_time'],
+        )
+        self.assertEqual(format_uuid(header['guid']), their['header']['guid'])
+        self.assertEqual(header['hotkey'], 0)
+
+        location = res['link_info']['location_info']
+        self.assertEqual(
+            hex(location['drive_serial_number']),
+            their['link_info']['location_info']['drive_serial_number'],
+        )
+        item = res['target']['items'][-1]
+        self.assertEqual(
+            dostime_to_datetime(item['modification_time']),
+            their['target']['items'][-1]['modification_time'],
+        )
+        tracker = res['extra']['DISTRIBUTED_LINK_TRACKER_BLOCK']
+        self.assertEqual(len(tracker['droid_file_identifier']), 16)
+
+        # GUIDs are rendered in hex
+        mock_stdout = StringIO()
+        with redirect_stdout(mock_stdout):
+            lnk.print_json()
+        our = json.loads(mock_stdout.getvalue())
+        self.assertEqual(our['header']['guid'], header['guid'].hex())
+
+    def test_lnk_batch(self):
+        paths = sorted(entry.path for entry in os.scandir(TARGET_DIR))
+        batch = LnkParse3.LnkBatch.from_paths(
+            paths + ['README.md', 'does_not_exist'], use_numpy=False
+        )
+
+        self.assertEqual(list(batch.paths), paths)
+        self.assertEqual(
+            [error.split(':')[0] for _, error in batch.errors],
+            ['ValueError', 'FileNotFoundError'],
+        )
+
+        headers = [LnkParse3.peek_header(path) for path in paths]
+        self.assertEqual(
+            batch.has_flag('HasArguments'),
+            ['HasArguments' in header.link_flags() for header in headers],
+        )
+        for seconds, header in zip(batch.epoch('creation_time'), headers):
+            if header.creation_time() is None:
+                self.assertTrue(math.isnan(seconds))
+            else:
+                # datetime has no sub-microsecond precision
+                self.assertAlmostEqual(
+                    seconds, header.creation_time().timestamp(), places=5
+                )
+
+        start = datetime(2020, 1, 1)
+        end = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        selected = batch.filter(batch.time_between('write_time', start, end))
+        self.assertEqual(
+            list(selected.paths),
+            [
+                path
+                for path, header in zip(paths, headers)
+                if header.write_time()
+                and start.replace(tzinfo=timezone.utc) <= header.write_time() < end
+            ],
+        )
+        self.assertEqual(selected[0]['path'], selected.paths[0])
+        self.assertEqual(
+            selected[0]['file_size'],
+            LnkParse3.peek_header(selected.paths[0]).file_size(),
+        )
+
+    def test_diagnostics(self):
+        lnk = LnkParse3.lnk_file(path='tests/samples/sample3')
+        lnk.get_json()
+        self.assertEqual(lnk.diagnostics.counts, {'invalid-filetime': 3})
+        self.assertEqual([d.offset for d in lnk.diagnostics], [28, 36, 44])
+
+        # Reading a field again does not report it again
+        lnk.header.creation_time()
+        with redirect_stdout(StringIO()):
+            lnk.print_lnk_file()
+        self.assertEqual(lnk.diagnostics.counts, {'invalid-filetime': 3})
+
+        lnk = LnkParse3.lnk_file(path='tests/samples/sample')
+        lnk.get_json()
+        self.assertEqual(
+            list(lnk.diagnostics),
+            [Diagnostic('invalid-dostime', 0x168, 'Invalid dostime: 9a 50 ac 53')],
+        )
+
+        with open('tests/samples/microsoft_example', 'rb') as indata:
+            data = bytearray(indata.read())
+        data[66] = 1  # Reserved1
+
+        lnk = LnkParse3.lnk_file(indata=bytes(data), validation='lenient')
+        lnk.get_json(True)
+        self.assertEqual(
+            list(lnk.diagnostics),
+            [Diagnostic('invalid-value', 66, 'reserved0 must be 0: 1')],
+        )
+
+        lnk = LnkParse3.lnk_file(indata=bytes(data), validation='off')
+        lnk.get_json(True)
+        self.assertFalse(lnk.diagnostics)
+
+        lnk = LnkParse3.lnk_file(indata=bytes(data), validation='strict')
+        with self.assertRaises(ValidationError):
+            lnk.get_json(True)
+
+    def test_lazy_sections_after_context_reset(self):
+        ctx = ParseContext(profile=True)
+        lnk = LnkParse3.lnk_file(path='tests/samples/decoding_error4', lazy=True, ctx=ctx)
+        other = LnkParse3.lnk_file(path='tests/samples/microsoft_example', ctx=ctx)
+        # The shared context was reset, the sections are decoded only now
+        lnk.get_json()
+
+        self.assertEqual(lnk.diagnostics.counts, {'decoding-error': 1})
+        self.assertIn('targets', lnk.metrics.stages)
+        self.assertFalse(other.diagnostics)
+        self.assertEqual(other.metrics.files, 1)
+        self.assertIs(ctx.diagnostics, other.diagnostics)
+
+    def test_profile_metrics(self):
+        lnk = LnkParse3.lnk_file(path='tests/samples/microsoft_example')
+        self.assertIsNone(lnk.metrics)
+
+        lnk = LnkParse3.lnk_file(
+            path='tests/samples/microsoft_example', profile=True
+        )
+        lnk.get_json()
+        stages = lnk.metrics.stages
+        for name in ('header', 'targets', 'link_info', 'extras'):
+            self.assertIn(name, stages)
+        self.assertEqual(stages['header'].nbytes, 76)
+        self.assertEqual(stages['extra.DistributedTracker'].calls, 1)
+        self.assertEqual(stages['extra.DistributedTracker'].nbytes, 96)
+
+        total = Metrics()
+        total.merge(lnk.metrics)
+        total.merge(lnk.metrics)
+        self.assertEqual(total.files, 2)
+        self.assertEqual(total.stages['header'].calls, 2)
+
+    def test_memory_report(self):
+        paths = [
+            os.path.join(TARGET_DIR, 'microsoft_example'),
+            os.path.join(TARGET_DIR, 'network_info'),
+        ]
+        report = MemoryReport(ratio=0)
+        for res in LnkParse3.parse_many(paths, workers=1, memory=True):
+            result, record = res.result
+            self.assertEqual(result, LnkParse3.lnk_file(path=res.path).get_json())
+            self.assertEqual(record.path, res.path)
+            self.assertGreater(record.retained, 0)
+            report.add(record)
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(report.files, 2)
+        self.assertEqual(report.nbytes, 459 + 2539)
+        self.assertEqual(report.over, 2)
+        self.assertEqual(report.metrics.stages['extra.DistributedTracker'].calls, 2)
+
+        # A parsed file does not wait for the cyclic GC to be freed
+        lnk = LnkParse3.lnk_file(path=paths[1])
+        lnk.get_json()
+        refs = [weakref.ref(lnk), weakref.ref(lnk.ctx)]
+        gc.disable()
+        try:
+            del lnk
+            self.assertEqual([ref() for ref in refs], [None, None])
+        finally:
+            gc.enable()
+
+    def test_extra_data_lookup_by_signature(self):
+        lnk = LnkParse3.lnk_file(path='tests/samples/network_info', lazy=True)
+        extras = lnk.extras
+
+        tracker = extras.get(0xA0000003)
+        self.assertEqual(tracker.name(), 'DISTRIBUTED_LINK_TRACKER_BLOCK')
+        self.assertEqual(tracker.length(), 88)
+        self.assertIs(extras.get(0xA0000003), tracker)
+        # The metadata block was indexed, but not created
+        self.assertIn(0xA0000009, extras)
+        self.assertEqual(len(extras._blocks), 1)
+
+        self.assertIsNone(extras.get(0xA0000001))
+        self.assertNotIn(0xA0000001, extras)
+        self.assertEqual(
+            [block.name() for block in extras],
+            ['DISTRIBUTED_LINK_TRACKER_BLOCK', 'METADATA_PROPERTIES_BLOCK'],
+        )
+
+    def test_targets_random_access(self):
+        lnk = LnkParse3.lnk_file(path='tests/samples/microsoft_example')
+        targets = lnk.targets
+
+        self.assertEqual(len(targets), 4)
+        self.assertEqual(targets[-1].as_item()['primary_name'], 'a.txt')
+        self.assertIs(targets[0], targets[0])
+        self.assertEqual(list(targets), [targets[i] for i in range(4)])
+        with self.assertRaises(IndexError):
+            targets[4]
+
+        # The IDList is cut in the header of the second item
+        with open('tests/samples/microsoft_example', 'rb') as indata:
+            data = indata.read()
+        targets = LnkTargets(indata=data[76 : 76 + 2 + 20 + 2])
+        with self.assertRaises(StructError):
+            len(targets)
+        with self.assertRaises(StructError):
+            targets[0]
+        with self.assertRaises(StructError):
+            list(targets)
+
+    def test_write_ndjson(self):
+        paths = sorted(entry.path for entry in os.scandir(TARGET_DIR))
+        paths.append(os.path.join(TARGET_DIR, 'does_not_exist'))
+
+        out = StringIO()
+        failed = LnkParse3.write_ndjson(paths, out, batch_size=4, get_all=True)
+
+        self.assertEqual(failed, 1)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([record.pop('path') for record in records], paths)
+        self.assertIn('FileNotFoundError', records[-1]['error'])
+        for path, record in zip(paths, records[:-1]):
+            self.assertIsNone(record.pop('error'))
+            json_path = os.path.join(JSON_DIR, f"{os.path.basename(path)}.json")
+            with open(json_path, 'rb') as fp:
+                their = json.load(fp)
+            self.assertDictEqual(record, their)
+
+    def test_run_stats(self):
+        paths = sorted(entry.path for entry in os.scandir(TARGET_DIR))
+        paths.append(os.path.join(TARGET_DIR, 'does_not_exist'))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            prom = os.path.join(tmp, 'lnkparse.prom')
+            progress = StringIO()
+            stats = RunStats(slowest=3, progress=progress, prometheus=prom)
+            with stats:
+                out = StringIO()
+                failed = LnkParse3.write_ndjson(paths, out, stats=stats)
+            with open(prom) as fp:
+                exported = fp.read().splitlines()
+            self.assertEqual(os.listdir(tmp), ['lnkparse.prom'])
+
+        self.assertEqual(failed, 1)
+        self.assertEqual(stats.files, len(paths))
+        self.assertEqual(stats.errors, {'FileNotFoundError': 1})
+        self.assertEqual(stats.diagnostics['invalid-filetime'], 9)
+        self.assertEqual(
+            stats.nbytes,
+            sum(os.path.getsize(path) for path in paths[:-1]),
+        )
+        self.assertEqual(len(stats.slowest()), 3)
+        self.assertTrue(
+            progress.getvalue().startswith('%d files, 1 failed, ' % len(paths))
+        )
+
+        self.assertIn('lnkparse_files_total %d' % len(paths), exported)
+        self.assertIn(
+            'lnkparse_failed_files_total{error="FileNotFoundError"} 1', exported
+        )
+        self.assertIn(
+            'lnkparse_parse_seconds_bucket{le="+Inf"} %d' % (len(paths) - 1),
+            exported,
+        )
+        slowest = [line for line in exported if line.startswith('lnkparse_slowest')]
+        self.assertEqual(len(slowest), 3)
+
+    def test_run_stats_report_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stats = RunStats(
+                interval=0.01, prometheus=os.path.join(tmp, 'missing', 'x.prom')
+            )
+            errors = StringIO()
+            with redirect_stderr(errors):
+                with stats:
+                    time.sleep(0.1)
+                    self.assertTrue(stats._thread.is_alive())
+                    # Reports work again once the directory is back
+                    os.mkdir(os.path.join(tmp, 'missing'))
+                    deadline = time.monotonic() + 5
+                    while not os.path.exists(stats.prometheus):
+                        self.assertLess(time.monotonic(), deadline)
+                        time.sleep(0.01)
+
+        self.assertEqual(errors.getvalue().count('Cannot report statistics'), 1)
+
+    def test_aiter_parse(self):
+        paths = sorted(entry.path for entry in os.scandir(TARGET_DIR))
+
+        async def collect(ordered):
+            return [
+                result
+                async for result in aiter_parse(paths, concurrency=3, ordered=ordered)
+            ]
+
+        for ordered in (False, True):
+            with self.subTest(ordered=ordered):
+                results = asyncio.run(collect(ordered))
+
+                if ordered:
+                    self.assertEqual([result.path for result in results], paths)
+                self.assertEqual(sorted(result.path for result in results), paths)
+                self.assertTrue(all(result.error is None for result in results))
+
+        result = asyncio.run(parse_async(paths[0]))
+        self.assertEqual(result.result, LnkParse3.lnk_file(path=paths[0]).get_json())
+
+        # Same results as the sync API
+        async def collect_raw():
+            return [
+                result
+                async for result in aiter_parse(
+                    paths, ordered=True, raw=True, validation='strict'
+                )
+            ]
+
+        self.assertEqual(
+            asyncio.run(collect_raw()),
+            list(
+                LnkParse3.parse_many(
+                    paths, workers=1, raw=True, validation='strict'
+                )
+            ),
+        )
+
+        # A semaphore shared by two calls limits the files in flight of both
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def count_active(lnk):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+        async def shared():
+            semaphore = asyncio.Semaphore(2)
+
+            async def run():
+                return [
+                    result
+                    async for result in aiter_parse(
+                        paths, handler=count_active, semaphore=semaphore
+                    )
+                ]
+
+            return await asyncio.gather(run(), run())
+
+        first, second = asyncio.run(shared())
+        self.assertEqual(len(first) + len(second), 2 * len(paths))
+        self.assertEqual(active[1], 2)
+
+    def test_cli_multiple_files(self):
+        paths = ['tests/samples/microsoft_example', 'tests/samples/sample']
+        stdin = BytesIO(b'\0'.join(path.encode() for path in paths))
+        self.assertEqual(list(iter_paths(['-'], stdin=stdin)), paths)
+        self.assertIn(paths[0], iter_paths(['tests/samples']))
+        self.assertEqual(list(iter_paths(['tests/sam*/microsoft_*'])), paths[:1])
+
+        mock_stdout = StringIO()
+        with redirect_stdout(mock_stdout):
+            status = cli.main(['-t', *paths])
+
+        self.assertEqual(status, 0)
+        self.assertEqual(
+            mock_stdout.getvalue(),
+            '==> tests/samples/microsoft_example <==\n.\\a.txt\n'
+            '==> tests/samples/sample <==\n..\\AppData\\Roaming\\.minecraft\n',
+        )
+
     def test_unwanted_attributes_are_not_printed_if_not_specified(self):
         with open('tests/samples/microsoft_example', 'rb') as indata:
             lnk = LnkParse3.lnk_file(indata)